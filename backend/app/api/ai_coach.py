@@ -1,44 +1,37 @@
 from fastapi import APIRouter
+from fastapi.responses import StreamingResponse
 from datetime import datetime, date
-import os
-from groq import Groq
+from typing import Dict, List
+import json
 
 from ..models.schemas import AIDailyPlanRequest, AIWeeklyReflectionRequest
-from ..core.config import settings
+from ..services.llm_client import llm_client
 
 router = APIRouter()
 
-# Initialize Groq client lazily
-def get_groq_client():
-    """Get or create Groq client instance"""
-    api_key = settings.groq_api_key or os.getenv("GROQ_API_KEY")
-    if not api_key:
-        raise ValueError("Groq API key not found")
-    return Groq(api_key=api_key)
+DAILY_PLAN_SYSTEM_MESSAGE = "You are a helpful AI productivity coach. Always respond with valid JSON only, no additional text."
 
-@router.post("/daily-plan")
-async def generate_daily_plan(request: AIDailyPlanRequest):
-    """Generate AI-powered daily plan based on habits, mood, and tasks"""
-    try:
-        # Get current time context
-        current_hour = datetime.now().hour
-        time_of_day = "morning" if current_hour < 12 else "afternoon" if current_hour < 18 else "evening"
-        
-        # Build context from request data
-        habits_text = "\n".join([f"- {h.get('name', 'Unknown')}: {h.get('completionRate', 0)}% completion rate" 
-                                 for h in request.habits[:5]]) if request.habits and len(request.habits) > 0 else "No habits tracked"
-        
-        tasks_text = "\n".join([f"- {t.get('title', 'Unknown')} (Priority: {t.get('priority', 'medium')})"
-                                for t in request.tasks[:8]]) if request.tasks and len(request.tasks) > 0 else "No tasks pending"
-        
-        mood_text = f"Current mood: {request.mood}" if request.mood else "Mood not tracked"
-        
-        # Add timestamp and randomness to ensure variety
-        current_minute = datetime.now().minute
-        timestamp = datetime.now().isoformat()
-        
-        # Create prompt for Groq AI with more context for variety
-        prompt = f"""You are an AI productivity coach for MindGarden AI app. Generate a FRESH and UNIQUE daily plan based on the user's current state.
+def _build_daily_plan_prompt(request: AIDailyPlanRequest) -> str:
+    """Build the daily plan prompt from the user's habits, tasks and mood"""
+    # Get current time context
+    current_hour = datetime.now().hour
+    time_of_day = "morning" if current_hour < 12 else "afternoon" if current_hour < 18 else "evening"
+    
+    # Build context from request data
+    habits_text = "\n".join([f"- {h.get('name', 'Unknown')}: {h.get('completionRate', 0)}% completion rate" 
+                             for h in request.habits[:5]]) if request.habits and len(request.habits) > 0 else "No habits tracked"
+    
+    tasks_text = "\n".join([f"- {t.get('title', 'Unknown')} (Priority: {t.get('priority', 'medium')})"
+                            for t in request.tasks[:8]]) if request.tasks and len(request.tasks) > 0 else "No tasks pending"
+    
+    mood_text = f"Current mood: {request.mood}" if request.mood else "Mood not tracked"
+    
+    # Add timestamp and randomness to ensure variety
+    current_minute = datetime.now().minute
+    timestamp = datetime.now().isoformat()
+    
+    # Create prompt for Groq AI with more context for variety
+    return f"""You are an AI productivity coach for MindGarden AI app. Generate a FRESH and UNIQUE daily plan based on the user's current state.
 
 IMPORTANT: This is request at {timestamp}. Provide DIFFERENT suggestions and approaches each time, focusing on variety while maintaining quality.
 
@@ -80,13 +73,33 @@ Format your response as JSON:
 
 Remember: Each plan should feel FRESH and offer a DIFFERENT perspective or approach."""
 
+def _fallback_daily_plan(request: AIDailyPlanRequest) -> Dict:
+    """Basic plan used when the AI service is unavailable"""
+    current_hour = datetime.now().hour
+    return {
+        "priorityTask": request.tasks[0].get('title', 'Review your tasks') if request.tasks and len(request.tasks) > 0 else "Review your tasks",
+        "focusTime": "09:00 - 11:00",
+        "habitSuggestion": request.habits[0].get('name', 'Morning meditation') if request.habits and len(request.habits) > 0 else "Morning meditation",
+        "schedule": [
+            {"time": f"{current_hour:02d}:00", "activity": "Focus on priority task", "duration": "60 min", "priority": "high"},
+            {"time": f"{current_hour+1:02d}:00", "activity": "Take a break and hydrate", "duration": "15 min", "priority": "medium"},
+            {"time": f"{current_hour+1:02d}:15", "activity": "Continue with next task", "duration": "45 min", "priority": "medium"}
+        ],
+        "insight": "AI service temporarily unavailable. Here's a basic plan to keep you productive!"
+    }
+
+@router.post("/daily-plan")
+async def generate_daily_plan(request: AIDailyPlanRequest):
+    """Generate AI-powered daily plan based on habits, mood, and tasks"""
+    try:
+        prompt = _build_daily_plan_prompt(request)
+        
         # Call Groq API
-        groq_client = get_groq_client()
-        chat_completion = groq_client.chat.completions.create(
+        ai_content = await llm_client.complete(
             messages=[
                 {
                     "role": "system",
-                    "content": "You are a helpful AI productivity coach. Always respond with valid JSON only, no additional text."
+                    "content": DAILY_PLAN_SYSTEM_MESSAGE
                 },
                 {
                     "role": "user",
@@ -100,26 +113,133 @@ Remember: Each plan should feel FRESH and offer a DIFFERENT perspective or appro
         )
         
         # Parse AI response
-        import json
-        ai_response = json.loads(chat_completion.choices[0].message.content)
+        ai_response = json.loads(ai_content)
         
         return ai_response
         
     except Exception as e:
         print(f"Error generating AI plan: {str(e)}")
         # Fallback to basic recommendation if AI fails
-        current_hour = datetime.now().hour
-        return {
-            "priorityTask": request.tasks[0].get('title', 'Review your tasks') if request.tasks and len(request.tasks) > 0 else "Review your tasks",
-            "focusTime": "09:00 - 11:00",
-            "habitSuggestion": request.habits[0].get('name', 'Morning meditation') if request.habits and len(request.habits) > 0 else "Morning meditation",
-            "schedule": [
-                {"time": f"{current_hour:02d}:00", "activity": "Focus on priority task", "duration": "60 min", "priority": "high"},
-                {"time": f"{current_hour+1:02d}:00", "activity": "Take a break and hydrate", "duration": "15 min", "priority": "medium"},
-                {"time": f"{current_hour+1:02d}:15", "activity": "Continue with next task", "duration": "45 min", "priority": "medium"}
-            ],
-            "insight": "AI service temporarily unavailable. Here's a basic plan to keep you productive!"
-        }
+        return _fallback_daily_plan(request)
+
+class ScheduleItemParser:
+    """
+    Incremental scanner over a streamed plan JSON document.
+    
+    Characters are fed as they arrive; every object inside the top-level
+    ``schedule`` array is returned as soon as its closing brace is seen.
+    """
+    
+    def __init__(self):
+        self.buffer = ""
+        self.stack = []
+        self.in_string = False
+        self.escaped = False
+        self.string_start = None
+        self.last_string = None
+        self.current_key = None
+        self.schedule_depth = None
+        self.item_start = None
+    
+    def feed(self, text: str) -> List[Dict]:
+        items = []
+        offset = len(self.buffer)
+        self.buffer += text
+        
+        for index in range(offset, len(self.buffer)):
+            char = self.buffer[index]
+            
+            if self.in_string:
+                if self.escaped:
+                    self.escaped = False
+                elif char == "\\":
+                    self.escaped = True
+                elif char == '"':
+                    self.in_string = False
+                    self.last_string = self.buffer[self.string_start + 1:index]
+                continue
+            
+            if char == '"':
+                self.in_string = True
+                self.string_start = index
+            elif char == ":":
+                self.current_key = self.last_string
+            elif char == ",":
+                self.current_key = None
+            elif char in "{[":
+                self.stack.append(char)
+                if char == "[" and self.current_key == "schedule" and self.schedule_depth is None and len(self.stack) == 2:
+                    self.schedule_depth = len(self.stack)
+                elif char == "{" and self.schedule_depth is not None and len(self.stack) == self.schedule_depth + 1:
+                    self.item_start = index
+                self.current_key = None
+            elif char in "}]":
+                if char == "}" and self.item_start is not None and len(self.stack) == self.schedule_depth + 1:
+                    try:
+                        items.append(json.loads(self.buffer[self.item_start:index + 1]))
+                    except ValueError:
+                        pass
+                    self.item_start = None
+                elif char == "]" and self.schedule_depth is not None and len(self.stack) == self.schedule_depth:
+                    self.schedule_depth = None
+                if self.stack:
+                    self.stack.pop()
+        
+        return items
+
+def _parse_plan(content: str) -> Dict:
+    """Parse the streamed plan, ignoring any text around the JSON object"""
+    return json.loads(content[content.index("{"):content.rindex("}") + 1])
+
+def _sse_event(event: str, data) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+@router.post("/daily-plan/stream")
+async def stream_daily_plan(request: AIDailyPlanRequest):
+    """
+    Stream an AI daily plan as server-sent events.
+    
+    ``token`` events relay the raw completion text, ``schedule_item`` events
+    carry each schedule entry as soon as it is complete, and a final ``plan``
+    event holds the same response the non-streaming endpoint returns (the
+    fallback plan if generation or parsing fails), followed by ``done``.
+    """
+    
+    async def events():
+        parser = ScheduleItemParser()
+        try:
+            async for text in llm_client.stream(
+                messages=[
+                    {
+                        "role": "system",
+                        "content": DAILY_PLAN_SYSTEM_MESSAGE
+                    },
+                    {
+                        "role": "user",
+                        "content": _build_daily_plan_prompt(request)
+                    }
+                ],
+                model="openai/gpt-oss-120b",
+                temperature=0.9,
+                max_tokens=1024
+            ):
+                yield _sse_event("token", {"text": text})
+                for item in parser.feed(text):
+                    yield _sse_event("schedule_item", item)
+            
+            plan = _parse_plan(parser.buffer)
+        except Exception as e:
+            print(f"Error streaming AI plan: {str(e)}")
+            plan = _fallback_daily_plan(request)
+        
+        yield _sse_event("plan", plan)
+        yield _sse_event("done", {})
+    
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
 
 @router.get("/weekly-reflection")
 async def get_weekly_reflection(request: AIWeeklyReflectionRequest = None):
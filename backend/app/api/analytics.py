@@ -1,14 +1,84 @@
 from fastapi import APIRouter, Depends, Query, HTTPException
-from typing import Dict
+from typing import Dict, List
 from datetime import datetime, date, timedelta
 from bson import ObjectId
 
 from ..models.schemas import User
-from ..core.database import get_collection
+from ..core.database import get_collection, gather_queries, index_registry
+from ..core.cache import analytics_cache
 from ..api.auth import get_current_user
+from ..services.streak_service import streak_service
+from ..services.daily_stats import daily_stats_service
+from ..services.habit_calendar import CompletionCalendar, habit_calendar_store
 
 router = APIRouter()
 
+index_registry.index("habit_completions", [("user_id", 1), ("completed_at", 1)])
+index_registry.query("scoreboard habit window", "habit_completions", {
+    "user_id": ObjectId(),
+    "completed_at": {"$gte": datetime.utcnow() - timedelta(days=14), "$lt": datetime.utcnow()}
+})
+
+async def _dashboard_habit_stats(user_id: ObjectId, today: date) -> Dict:
+    """Active habit count and streak totals, joined with the materialized streak state"""
+    today_dt = datetime.combine(today, datetime.min.time())
+    pipeline = [
+        {"$match": {"user_id": user_id, "is_active": True}},
+        {"$lookup": {
+            "from": "habit_streaks",
+            "localField": "_id",
+            "foreignField": "habit_id",
+            "as": "streak"
+        }},
+        {"$set": {"streak": {"$arrayElemAt": ["$streak", 0]}}},
+        {"$facet": {
+            "totals": [
+                {"$group": {
+                    "_id": None,
+                    "habits_count": {"$sum": 1},
+                    "total_current_streak": {"$sum": {"$cond": [
+                        {"$eq": ["$streak.current_end", today_dt]},
+                        {"$add": [
+                            {"$dateDiff": {"startDate": "$streak.current_start", "endDate": "$streak.current_end", "unit": "day"}},
+                            1
+                        ]},
+                        0
+                    ]}},
+                    "longest_streak": {"$max": {"$ifNull": ["$streak.longest_streak", 0]}}
+                }}
+            ],
+            "missing_state": [
+                {"$match": {"streak": {"$exists": False}}},
+                {"$project": {"_id": 1}}
+            ]
+        }}
+    ]
+    result = (await get_collection("habits").aggregate(pipeline).to_list(length=1))[0]
+    
+    totals = result["totals"][0] if result["totals"] else {
+        "habits_count": 0, "total_current_streak": 0, "longest_streak": 0
+    }
+    
+    # Habits without streak state yet get it built once
+    if result["missing_state"]:
+        rebuilt = await gather_queries(*[
+            lambda habit=habit: streak_service.get_streaks(str(user_id), str(habit["_id"]))
+            for habit in result["missing_state"]
+        ])
+        for streaks in rebuilt:
+            totals["total_current_streak"] += streaks["current_streak"]
+            totals["longest_streak"] = max(totals["longest_streak"], streaks["longest_streak"])
+    
+    return totals
+
+async def _dashboard_overdue_tasks(user_id: ObjectId) -> int:
+    """Open tasks past their due date"""
+    return await get_collection("tasks").count_documents({
+        "user_id": user_id,
+        "due_date": {"$lt": datetime.now()},
+        "is_completed": False
+    })
+
 @router.get("/dashboard")
 async def get_dashboard_analytics(
     current_user: User = Depends(get_current_user),
@@ -16,123 +86,45 @@ async def get_dashboard_analytics(
 ):
     """Get comprehensive dashboard analytics"""
     
+    slot = await analytics_cache.slot(current_user.id, "dashboard", days=days)
+    cached = await slot.get()
+    if cached is not None:
+        return cached
+    
     # Calculate date range
     end_date = date.today()
     start_date = end_date - timedelta(days=days-1)
     
-    # Convert to datetime for MongoDB queries
-    start_date_dt = datetime.combine(start_date, datetime.min.time())
-    end_date_dt = datetime.combine(end_date, datetime.max.time())
-    
-    # Get collections
-    habits_collection = get_collection("habits")
-    habit_completions_collection = get_collection("habit_completions")
-    tasks_collection = get_collection("tasks")
-    mood_collection = get_collection("mood_logs")
-    
     user_id = ObjectId(current_user.id)
     
-    # Habits Analytics
-    habits_count = await habits_collection.count_documents({"user_id": user_id, "is_active": True})
+    # Streak state, overdue tasks and the daily rollup are read in parallel
+    habit_stats, overdue_tasks, daily_rows = await gather_queries(
+        lambda: _dashboard_habit_stats(user_id, end_date),
+        lambda: _dashboard_overdue_tasks(user_id),
+        lambda: daily_stats_service.load(current_user.id, start_date, end_date)
+    )
+    period_stats = daily_stats_service.summarize(daily_rows)
+    completions_count = period_stats["habit_completions"]
     
-    completions_count = await habit_completions_collection.count_documents({
-        "user_id": user_id,
-        "date": {"$gte": start_date_dt, "$lte": end_date_dt}
-    })
+    # Habits Analytics
+    habits_count = habit_stats["habits_count"]
+    total_current_streak = habit_stats["total_current_streak"]
+    longest_streak = habit_stats["longest_streak"]
     
     # Calculate habit completion rate
     expected_completions = habits_count * days
     habit_completion_rate = (completions_count / expected_completions * 100) if expected_completions > 0 else 0
     
-    # Get current streaks
-    habits_cursor = habits_collection.find({"user_id": user_id, "is_active": True})
-    total_current_streak = 0
-    longest_streak = 0
-    
-    async for habit in habits_cursor:
-        # Calculate streak for each habit
-        habit_completions = await habit_completions_collection.find(
-            {"user_id": user_id, "habit_id": habit["_id"]},
-            {"date": 1}
-        ).sort("date", -1).to_list(length=None)
-        
-        # Current streak calculation
-        current_streak = 0
-        today = date.today()
-        check_date = today
-        
-        # Convert datetime objects to date objects for comparison
-        completion_dates = {comp["date"].date() if isinstance(comp["date"], datetime) else comp["date"] for comp in habit_completions}
-        
-        while check_date in completion_dates:
-            current_streak += 1
-            check_date -= timedelta(days=1)
-        
-        total_current_streak += current_streak
-        
-        # Calculate longest streak for this habit
-        if completion_dates:
-            temp_streak = 0
-            temp_longest = 0
-            sorted_dates = sorted(completion_dates)
-            
-            if sorted_dates:
-                prev_date = sorted_dates[0] - timedelta(days=1)
-                for completion_date in sorted_dates:
-                    if completion_date == prev_date + timedelta(days=1):
-                        temp_streak += 1
-                    else:
-                        temp_longest = max(temp_longest, temp_streak)
-                        temp_streak = 1
-                    prev_date = completion_date
-                temp_longest = max(temp_longest, temp_streak)
-                longest_streak = max(longest_streak, temp_longest)
-    
     # Tasks Analytics
-    total_tasks = await tasks_collection.count_documents({
-        "user_id": user_id,
-        "created_at": {"$gte": datetime.combine(start_date, datetime.min.time())}
-    })
-    
-    completed_tasks = await tasks_collection.count_documents({
-        "user_id": user_id,
-        "is_completed": True,
-        "completed_at": {"$gte": datetime.combine(start_date, datetime.min.time())}
-    })
-    
-    overdue_tasks = await tasks_collection.count_documents({
-        "user_id": user_id,
-        "due_date": {"$lt": datetime.now()},
-        "is_completed": False
-    })
+    total_tasks = period_stats["tasks_created"]
+    completed_tasks = period_stats["tasks_completed"]
     
     task_completion_rate = (completed_tasks / total_tasks * 100) if total_tasks > 0 else 0
     
     # Mood Analytics
-    mood_logs = await mood_collection.find({
-        "user_id": user_id,
-        "date": {"$gte": start_date_dt, "$lte": end_date_dt}
-    }).to_list(length=None)
-    
-    if mood_logs:
-        # Calculate average mood score
-        mood_scores = []
-        energy_scores = []
-        
-        for log in mood_logs:
-            mood_score = {
-                "very_low": 1, "low": 2, "neutral": 3, "good": 4, "very_good": 5
-            }.get(log["mood"], 3)
-            mood_scores.append(mood_score)
-            energy_scores.append(log["energy"])
-        
-        avg_mood = sum(mood_scores) / len(mood_scores)
-        avg_energy = sum(energy_scores) / len(energy_scores)
-        mood_logs_count = len(mood_logs)
-    else:
-        avg_mood = 0
-        avg_energy = 0
-        mood_logs_count = 0
+    mood_logs_count = period_stats["mood_logs"]
+    avg_mood = period_stats["average_mood"]
+    avg_energy = period_stats["average_energy"]
     
     # Generate insights
     insights = []
@@ -164,7 +156,7 @@ async def get_dashboard_analytics(
     if mood_logs_count < (days * 0.5):
         insights.append("📱 Track your mood more regularly for better insights.")
     
-    return {
+    result = {
         "period": {
             "start_date": start_date.isoformat(),
             "end_date": end_date.isoformat(),
@@ -192,11 +184,19 @@ async def get_dashboard_analytics(
         "insights": insights,
         "garden_health": _calculate_garden_health(habit_completion_rate, task_completion_rate, avg_mood)
     }
+    
+    await slot.set(result)
+    return result
 
 @router.get("/weekly-report")
 async def get_weekly_report(current_user: User = Depends(get_current_user)):
     """Get weekly progress report"""
     
+    slot = await analytics_cache.slot(current_user.id, "weekly-report")
+    cached = await slot.get()
+    if cached is not None:
+        return cached
+    
     # Calculate week range (Monday to Sunday)
     today = date.today()
     days_since_monday = today.weekday()
@@ -215,17 +215,35 @@ async def get_weekly_report(current_user: User = Depends(get_current_user)):
     
     user_id = ObjectId(current_user.id)
     
-    # Weekly habits performance
-    habits = await habits_collection.find({"user_id": user_id, "is_active": True}).to_list(length=None)
+    # Habits, task counts and mood logs are independent; fetch them concurrently
+    habits, tasks_created, tasks_completed, mood_logs = await gather_queries(
+        lambda: habits_collection.find({"user_id": user_id, "is_active": True}).to_list(length=None),
+        lambda: tasks_collection.count_documents({
+            "user_id": user_id,
+            "created_at": {"$gte": start_of_week_dt, "$lte": end_of_week_dt}
+        }),
+        lambda: tasks_collection.count_documents({
+            "user_id": user_id,
+            "completed_at": {"$gte": start_of_week_dt, "$lte": end_of_week_dt}
+        }),
+        lambda: mood_collection.find({
+            "user_id": user_id,
+            "date": {"$gte": start_of_week_dt, "$lte": end_of_week_dt}
+        }).sort("date", 1).to_list(length=None)
+    )
     
-    habit_performance = []
-    for habit in habits:
-        completions = await habit_completions_collection.count_documents({
+    # Weekly habits performance
+    habit_completion_counts = await gather_queries(*[
+        lambda habit=habit: habit_completions_collection.count_documents({
             "user_id": user_id,
             "habit_id": habit["_id"],
             "date": {"$gte": start_of_week_dt, "$lte": end_of_week_dt}
         })
-        
+        for habit in habits
+    ])
+    
+    habit_performance = []
+    for habit, completions in zip(habits, habit_completion_counts):
         target_days = len(habit.get("target_days", [1, 2, 3, 4, 5, 6, 7]))
         completion_rate = (completions / target_days) * 100 if target_days > 0 else 0
         
@@ -236,29 +254,6 @@ async def get_weekly_report(current_user: User = Depends(get_current_user)):
             "completion_rate": round(completion_rate, 2)
         })
     
-    # Weekly tasks summary
-    tasks_created = await tasks_collection.count_documents({
-        "user_id": user_id,
-        "created_at": {
-            "$gte": datetime.combine(start_of_week, datetime.min.time()),
-            "$lte": datetime.combine(end_of_week, datetime.max.time())
-        }
-    })
-    
-    tasks_completed = await tasks_collection.count_documents({
-        "user_id": user_id,
-        "completed_at": {
-            "$gte": datetime.combine(start_of_week, datetime.min.time()),
-            "$lte": datetime.combine(end_of_week, datetime.max.time())
-        }
-    })
-    
-    # Weekly mood summary
-    mood_logs = await mood_collection.find({
-        "user_id": user_id,
-        "date": {"$gte": start_of_week_dt, "$lte": end_of_week_dt}
-    }).sort("date", 1).to_list(length=None)
-    
     mood_by_day = {}
     for i in range(7):
         day = start_of_week + timedelta(days=i)
@@ -323,7 +318,7 @@ async def get_weekly_report(current_user: User = Depends(get_current_user)):
                 "energy": 0
             })
     
-    return {
+    result = {
         "week_period": {
             "start": start_of_week.isoformat(),
             "end": end_of_week.isoformat(),
@@ -349,6 +344,9 @@ async def get_weekly_report(current_user: User = Depends(get_current_user)):
         "moodVariance": round(variance, 2),
         "dailyData": daily_data
     }
+    
+    await slot.set(result)
+    return result
 
 @router.get("/monthly-trends")
 async def get_monthly_trends(
@@ -357,9 +355,14 @@ async def get_monthly_trends(
 ):
     """Get monthly trends and patterns"""
     
+    slot = await analytics_cache.slot(current_user.id, "monthly-trends", months=months)
+    cached = await slot.get()
+    if cached is not None:
+        return cached
+    
     # Calculate month ranges
     today = date.today()
-    trends_data = []
+    month_ranges = []
     
     for i in range(months):
         # Calculate month start and end
@@ -372,85 +375,53 @@ async def get_monthly_trends(
         else:
             next_month = month_start.replace(month=month_start.month + 1)
         month_end = next_month - timedelta(days=1)
-        
+        month_ranges.append((month_start, month_end))
+    
+    # One read of the daily rollup covers every month
+    daily_rows = await daily_stats_service.load(
+        current_user.id,
+        min(month_start for month_start, _ in month_ranges),
+        max(month_end for _, month_end in month_ranges)
+    )
+    
+    trends_data = []
+    for month_start, month_end in month_ranges:
         # Get month analytics (simplified version of dashboard)
-        month_analytics = await _get_period_analytics(current_user.id, month_start, month_end)
+        month_analytics = _get_period_analytics(daily_rows, month_start, month_end)
         month_analytics["month"] = month_start.strftime("%Y-%m")
         month_analytics["month_name"] = month_start.strftime("%B %Y")
-        
         trends_data.append(month_analytics)
     
-    return {
+    result = {
         "trends": list(reversed(trends_data)),  # Chronological order
         "period": f"Last {months} months"
     }
-
-async def _get_period_analytics(user_id: str, start_date: date, end_date: date) -> Dict:
-    """Helper function to get analytics for a specific period"""
-    
-    # Get collections
-    habit_completions_collection = get_collection("habit_completions")
-    tasks_collection = get_collection("tasks")
-    mood_collection = get_collection("mood_logs")
     
-    user_obj_id = ObjectId(user_id)
+    await slot.set(result)
+    return result
+
+def _get_period_analytics(daily_rows: List[Dict], start_date: date, end_date: date) -> Dict:
+    """Helper function to get analytics for a specific period from daily rollup documents"""
     
-    # Convert dates to datetime for MongoDB queries
     start_date_dt = datetime.combine(start_date, datetime.min.time())
-    end_date_dt = datetime.combine(end_date, datetime.max.time())
-    
-    # Habit completions
-    habit_completions = await habit_completions_collection.count_documents({
-        "user_id": user_obj_id,
-        "date": {"$gte": start_date_dt, "$lte": end_date_dt}
-    })
+    end_date_dt = datetime.combine(end_date, datetime.min.time())
     
-    # Task analytics
-    tasks_completed = await tasks_collection.count_documents({
-        "user_id": user_obj_id,
-        "is_completed": True,
-        "completed_at": {
-            "$gte": datetime.combine(start_date, datetime.min.time()),
-            "$lte": datetime.combine(end_date, datetime.max.time())
-        }
-    })
-    
-    total_tasks = await tasks_collection.count_documents({
-        "user_id": user_obj_id,
-        "created_at": {
-            "$gte": datetime.combine(start_date, datetime.min.time()),
-            "$lte": datetime.combine(end_date, datetime.max.time())
-        }
-    })
+    stats = daily_stats_service.summarize(
+        row for row in daily_rows if start_date_dt <= row["date"] <= end_date_dt
+    )
     
-    # Mood analytics
-    mood_logs = await mood_collection.find({
-        "user_id": user_obj_id,
-        "date": {"$gte": start_date_dt, "$lte": end_date_dt}
-    }).to_list(length=None)
-    
-    if mood_logs:
-        mood_scores = []
-        for log in mood_logs:
-            mood_score = {
-                "very_low": 1, "low": 2, "neutral": 3, "good": 4, "very_good": 5
-            }.get(log["mood"], 3)
-            mood_scores.append(mood_score)
-        
-        avg_mood = sum(mood_scores) / len(mood_scores)
-        avg_energy = sum(log["energy"] for log in mood_logs) / len(mood_logs)
-    else:
-        avg_mood = 0
-        avg_energy = 0
+    habit_completions = stats["habit_completions"]
+    tasks_completed = stats["tasks_completed"]
+    total_tasks = stats["tasks_created"]
     
     return {
         "habit_completions": habit_completions,
         "tasks_completed": tasks_completed,
         "total_tasks": total_tasks,
         "task_completion_rate": (tasks_completed / total_tasks * 100) if total_tasks > 0 else 0,
-        "mood_logs": len(mood_logs),
-        "average_mood": round(avg_mood, 2),
-        "average_energy": round(avg_energy, 2)
+        "mood_logs": stats["mood_logs"],
+        "average_mood": round(stats["average_mood"], 2),
+        "average_energy": round(stats["average_energy"], 2)
     }
 
 def _calculate_garden_health(habit_rate: float, task_rate: float, mood_score: float) -> Dict:
@@ -490,13 +461,18 @@ def _calculate_garden_health(habit_rate: float, task_rate: float, mood_score: fl
 
 @router.get("/scoreboard")
 async def get_scoreboard(
-    current_user: dict = Depends(get_current_user)
+    current_user: User = Depends(get_current_user)
 ):
     """
     Get weekly activity scoreboard with streaks, comparisons, and daily breakdown
     """
+    slot = await analytics_cache.slot(current_user.id, "scoreboard")
+    cached = await slot.get()
+    if cached is not None:
+        return cached
+    
     try:
-        user_id = ObjectId(current_user["id"])
+        user_id = ObjectId(current_user.id)
         
         # Get collections
         habit_completions_collection = get_collection("habit_completions")
@@ -514,105 +490,68 @@ async def get_scoreboard(
         
         # Last week
         last_week_start = week_start - timedelta(days=7)
-        last_week_end = week_start
-        
-        # Get habit completions for streak calculation
-        all_completions = await habit_completions_collection.find({
-            "user_id": user_id
-        }).sort("completed_at", 1).to_list(length=None)
-        
-        # Calculate current streak (consecutive days with at least 1 completion)
-        current_streak = 0
-        if all_completions:
-            # Get unique completion dates
-            completion_dates = sorted(set(
-                datetime.combine(c["completed_at"].date(), datetime.min.time())
-                for c in all_completions
-            ), reverse=True)
-            
-            # Count consecutive days from today backwards
-            check_date = today
-            for comp_date in completion_dates:
-                if comp_date == check_date:
-                    current_streak += 1
-                    check_date -= timedelta(days=1)
-                elif comp_date < check_date:
-                    # Gap found, stop counting
-                    break
-        
-        # Calculate longest streak
-        longest_streak = 0
-        if all_completions:
-            completion_dates = sorted(set(
-                datetime.combine(c["completed_at"].date(), datetime.min.time())
-                for c in all_completions
-            ))
-            
-            temp_streak = 1
-            for i in range(1, len(completion_dates)):
-                days_diff = (completion_dates[i] - completion_dates[i-1]).days
-                if days_diff == 1:
-                    temp_streak += 1
-                    longest_streak = max(longest_streak, temp_streak)
-                else:
-                    temp_streak = 1
-            longest_streak = max(longest_streak, temp_streak)
-        
-        # This week metrics
-        this_week_habits = await habit_completions_collection.count_documents({
-            "user_id": user_id,
-            "completed_at": {"$gte": week_start, "$lt": week_end}
-        })
-        
-        this_week_tasks = await tasks_collection.count_documents({
-            "user_id": user_id,
-            "completed": True,
-            "updated_at": {"$gte": week_start, "$lt": week_end}
-        })
-        
-        this_week_moods = await mood_collection.count_documents({
-            "user_id": user_id,
-            "timestamp": {"$gte": week_start, "$lt": week_end}
-        })
         
-        # Get average mood this week
-        this_week_mood_logs = await mood_collection.find({
-            "user_id": user_id,
-            "timestamp": {"$gte": week_start, "$lt": week_end}
-        }).to_list(length=None)
+        def daily_pipeline(match: Dict, time_field: str, extra_group: Dict = None) -> list:
+            """Group a collection by day over the two-week window"""
+            return [
+                {"$match": {**match, time_field: {"$gte": last_week_start, "$lt": week_end}}},
+                {"$group": {
+                    "_id": {"$dateTrunc": {"date": f"${time_field}", "unit": "day"}},
+                    "count": {"$sum": 1},
+                    **(extra_group or {})
+                }}
+            ]
+        
+        async def activity_calendar() -> CompletionCalendar:
+            """Days with at least one habit completion, from the per-habit calendars"""
+            habits = await get_collection("habits").find({"user_id": user_id}, {"_id": 1}).to_list(length=None)
+            calendars = await habit_calendar_store.load_many(str(user_id), [habit["_id"] for habit in habits])
+            return CompletionCalendar.union(calendars.values())
+        
+        # One aggregation per collection covers the daily breakdown and both weekly totals;
+        # streaks come from the completion calendars instead of the raw history
+        habit_days, task_days, mood_days, activity = await gather_queries(
+            lambda: habit_completions_collection.aggregate(
+                daily_pipeline({"user_id": user_id}, "completed_at")
+            ).to_list(length=None),
+            lambda: tasks_collection.aggregate(
+                daily_pipeline({"user_id": user_id, "completed": True}, "updated_at")
+            ).to_list(length=None),
+            lambda: mood_collection.aggregate(
+                daily_pipeline({"user_id": user_id}, "timestamp", {"mood_total": {"$sum": {"$ifNull": ["$mood_level", 0]}}})
+            ).to_list(length=None),
+            activity_calendar
+        )
+        
+        habits_by_day = {day["_id"]: day["count"] for day in habit_days}
+        tasks_by_day = {day["_id"]: day["count"] for day in task_days}
+        moods_by_day = {day["_id"]: day for day in mood_days}
+        
+        def week_total(by_day: Dict, start: datetime, key=None) -> int:
+            days = [start + timedelta(days=i) for i in range(7)]
+            if key is None:
+                return sum(by_day.get(day, 0) for day in days)
+            return sum(by_day[day][key] for day in days if day in by_day)
+        
+        this_week_habits = week_total(habits_by_day, week_start)
+        this_week_tasks = week_total(tasks_by_day, week_start)
+        this_week_moods = week_total(moods_by_day, week_start, "count")
+        last_week_habits = week_total(habits_by_day, last_week_start)
+        last_week_tasks = week_total(tasks_by_day, last_week_start)
+        last_week_moods = week_total(moods_by_day, last_week_start, "count")
+        
+        # Streaks count days with at least 1 completion of any habit
+        streaks = activity.streaks(today.date())
+        current_streak = streaks["current_streak"]
+        longest_streak = streaks["longest_streak"]
         
         avg_mood_this_week = 0
-        if this_week_mood_logs:
-            total_mood = sum(log.get("mood_level", 0) for log in this_week_mood_logs)
-            avg_mood_this_week = total_mood / len(this_week_mood_logs)
-        
-        # Last week metrics
-        last_week_habits = await habit_completions_collection.count_documents({
-            "user_id": user_id,
-            "completed_at": {"$gte": last_week_start, "$lt": last_week_end}
-        })
-        
-        last_week_tasks = await tasks_collection.count_documents({
-            "user_id": user_id,
-            "completed": True,
-            "updated_at": {"$gte": last_week_start, "$lt": last_week_end}
-        })
-        
-        last_week_moods = await mood_collection.count_documents({
-            "user_id": user_id,
-            "timestamp": {"$gte": last_week_start, "$lt": last_week_end}
-        })
-        
-        # Get average mood last week
-        last_week_mood_logs = await mood_collection.find({
-            "user_id": user_id,
-            "timestamp": {"$gte": last_week_start, "$lt": last_week_end}
-        }).to_list(length=None)
+        if this_week_moods:
+            avg_mood_this_week = week_total(moods_by_day, week_start, "mood_total") / this_week_moods
         
         avg_mood_last_week = 0
-        if last_week_mood_logs:
-            total_mood = sum(log.get("mood_level", 0) for log in last_week_mood_logs)
-            avg_mood_last_week = total_mood / len(last_week_mood_logs)
+        if last_week_moods:
+            avg_mood_last_week = week_total(moods_by_day, last_week_start, "mood_total") / last_week_moods
         
         # Calculate percentage changes
         def calc_change(current, previous):
@@ -656,23 +595,9 @@ async def get_scoreboard(
         daily_breakdown = []
         for i in range(7):
             day_start = week_start + timedelta(days=i)
-            day_end = day_start + timedelta(days=1)
-            
-            day_habits = await habit_completions_collection.count_documents({
-                "user_id": user_id,
-                "completed_at": {"$gte": day_start, "$lt": day_end}
-            })
-            
-            day_tasks = await tasks_collection.count_documents({
-                "user_id": user_id,
-                "completed": True,
-                "updated_at": {"$gte": day_start, "$lt": day_end}
-            })
-            
-            day_moods = await mood_collection.count_documents({
-                "user_id": user_id,
-                "timestamp": {"$gte": day_start, "$lt": day_end}
-            })
+            day_habits = habits_by_day.get(day_start, 0)
+            day_tasks = tasks_by_day.get(day_start, 0)
+            day_moods = moods_by_day[day_start]["count"] if day_start in moods_by_day else 0
             
             daily_breakdown.append({
                 "date": day_start.strftime("%Y-%m-%d"),
@@ -683,7 +608,7 @@ async def get_scoreboard(
                 "total": day_habits + day_tasks + day_moods
             })
         
-        return {
+        result = {
             "current_streak": current_streak,
             "longest_streak": longest_streak,
             "overall_score": round(overall_score, 2),
@@ -709,5 +634,8 @@ async def get_scoreboard(
             "daily_breakdown": daily_breakdown
         }
         
+        await slot.set(result)
+        return result
+        
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error fetching scoreboard: {str(e)}")
\ No newline at end of file
@@ -6,19 +6,27 @@ from typing import Optional
 
 from bson import ObjectId
 from ..models.schemas import User, UserCreate, UserLogin, UserResponse, TokenResponse
-from ..core.database import get_collection
-from ..core.auth import verify_password, get_password_hash, create_access_token, verify_token
+from ..core.database import get_collection, index_registry
+from ..core.auth import verify_password_async, get_password_hash_async, create_access_token, verify_token
 from ..core.config import settings
+from ..core.cache import user_cache
 from ..services.email_service import email_service
 
 router = APIRouter()
 security = HTTPBearer()
 
+index_registry.index("users", [("email", 1)], unique=True)
+index_registry.query("user by email", "users", {"email": "user@example.com"})
+
 async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)) -> User:
     """Get current authenticated user"""
     payload = verify_token(credentials.credentials)
     user_id = payload.get("sub")
     
+    cached_user = user_cache.get(user_id)
+    if cached_user is not None:
+        return cached_user
+    
     users_collection = get_collection("users")
     user_data = await users_collection.find_one({"_id": ObjectId(user_id)})
     
@@ -28,7 +36,9 @@ async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(s
             detail="User not found"
         )
     
-    return User(**user_data)
+    user = User(**user_data)
+    user_cache.set(user_id, user)
+    return user
 
 @router.post("/register", response_model=TokenResponse)
 async def register(user_data: UserCreate, background_tasks: BackgroundTasks):
@@ -48,7 +58,7 @@ async def register(user_data: UserCreate, background_tasks: BackgroundTasks):
         
         # Create user document
         user_dict = user_data.model_dump()
-        user_dict["password_hash"] = get_password_hash(user_data.password)
+        user_dict["password_hash"] = await get_password_hash_async(user_data.password)
         del user_dict["password"]  # Remove plain password
         
         user_dict["created_at"] = datetime.utcnow()
@@ -119,7 +129,7 @@ async def login(login_data: UserLogin):
         )
     
     # Verify password
-    if not user_data.get("password_hash") or not verify_password(login_data.password, user_data["password_hash"]):
+    if not user_data.get("password_hash") or not await verify_password_async(login_data.password, user_data["password_hash"]):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid email or password"
@@ -130,6 +140,7 @@ async def login(login_data: UserLogin):
         {"_id": user_data["_id"]},
         {"$set": {"last_login": datetime.utcnow()}}
     )
+    user_cache.invalidate(str(user_data["_id"]))
     
     # Create access token
     access_token = create_access_token(data={"sub": str(user_data["_id"])})
@@ -1,14 +1,17 @@
-from fastapi import APIRouter, Depends, BackgroundTasks, HTTPException
+from fastapi import APIRouter, Depends, HTTPException
 from typing import List, Dict, Optional
 from datetime import datetime, date, timedelta
 from bson import ObjectId
 from pydantic import BaseModel, EmailStr
 
 from ..models.schemas import User
-from ..core.database import get_collection
+from ..core.config import settings
+from ..core.database import get_collection, cursor_batches
 from ..api.auth import get_current_user
 from ..services.email_service import email_service
-from ..api.notifications import get_groq_client
+from ..services.email_outbox import email_outbox
+from ..services.notification_emails import NotificationEmailRun
+from ..services.notification_preferences import notification_preference_store
 
 
 router = APIRouter()
@@ -29,7 +32,6 @@ class NotificationEmailRequest(BaseModel):
 @router.post("/send-bulk")
 async def send_bulk_email(
     email_request: EmailRequest,
-    background_tasks: BackgroundTasks,
     current_user: User = Depends(get_current_user)
 ):
     """Send bulk emails to users (admin only in production)"""
@@ -63,204 +65,93 @@ async def send_bulk_email(
     if not recipients:
         raise HTTPException(status_code=404, detail="No recipients found")
     
-    # Send emails in background
-    background_tasks.add_task(
-        email_service.send_bulk_emails,
+    # Queue emails for the outbox worker
+    messages = email_service.render_bulk_emails(
         recipients=recipients,
         subject=email_request.subject,
         html_template=email_request.html_content,
         personalize=True
     )
+    batch_id = await email_outbox.enqueue(messages, kind="bulk", created_by=current_user.id)
     
     return {
         "message": f"Email sending initiated for {len(recipients)} recipients",
-        "recipient_count": len(recipients)
+        "recipient_count": len(recipients),
+        "batch_id": batch_id
     }
 
 
 @router.post("/send-notifications")
 async def send_notification_emails(
     request: NotificationEmailRequest,
-    background_tasks: BackgroundTasks,
     current_user: User = Depends(get_current_user)
 ):
     """Send notification emails (habits/tasks) to all users or users with preferences enabled"""
     
     users_collection = get_collection("users")
-    habits_collection = get_collection("habits")
-    tasks_collection = get_collection("tasks")
-    habit_completions_collection = get_collection("habit_completions")
-    notification_preferences_collection = get_collection("notification_preferences")
     
     today = date.today()
+    run = NotificationEmailRun(request.notification_type, created_by=current_user.id)
     
-    # Get all users
-    all_users = await users_collection.find({}).to_list(length=None)
+    # Stream users in batches so memory stays flat and queries grow with batches, not users
+    users_cursor = users_collection.find({}, {"email": 1, "full_name": 1}).batch_size(settings.notification_batch_size)
     
-    if not all_users:
-        raise HTTPException(status_code=404, detail="No users found")
-    
-    emails_to_send = []
+    users_count = 0
     
-    for user in all_users:
-        user_id = user["_id"]
-        email = user.get("email")
-        
-        if not email:
+    async for users in cursor_batches(users_cursor, settings.notification_batch_size):
+        users_count += len(users)
+        users = [user for user in users if user.get("email")]
+        user_ids = [user["_id"] for user in users]
+        if not user_ids:
             continue
         
         # Check notification preferences
         if request.send_to == "preferences":
-            prefs = await notification_preferences_collection.find_one({"user_id": user_id})
-            if not prefs:
-                continue  # Skip if no preferences set
-            
-            if request.notification_type == "habits" and not prefs.get("habits_enabled", True):
-                continue
-            if request.notification_type == "tasks" and not prefs.get("tasks_enabled", True):
+            preferences = await notification_preference_store.get_many(user_ids)
+            enabled_field = "habits_enabled" if request.notification_type == "habits" else "tasks_enabled"
+            # Users without preferences are skipped
+            enabled_user_ids = {
+                ObjectId(user_id) for user_id, prefs in preferences.items()
+                if prefs is not None and prefs.get(enabled_field, True)
+            }
+            users = [user for user in users if user["_id"] in enabled_user_ids]
+            user_ids = [user["_id"] for user in users]
+            if not user_ids:
                 continue
         
-        # Get user's pending items
-        if request.notification_type == "habits":
-            # Get pending habits
-            habits = await habits_collection.find({
-                "user_id": user_id,
-                "is_active": True
-            }).to_list(length=None)
-            
-            pending_items = []
-            for habit in habits:
-                today_weekday = today.weekday() + 1
-                frequency = habit.get("frequency", [])
-                
-                if today_weekday in frequency or not frequency:
-                    completion = await habit_completions_collection.find_one({
-                        "user_id": user_id,
-                        "habit_id": habit["_id"],
-                        "date": today.isoformat()
-                    })
-                    
-                    if not completion:
-                        pending_items.append({
-                            "name": habit["name"],
-                            "streak": habit.get("current_streak", 0),
-                            "category": habit.get("category", "General")
-                        })
-            
-            if not pending_items:
-                continue  # No pending habits for this user
-            
-        else:  # tasks
-            # Get incomplete tasks
-            tasks = await tasks_collection.find({
-                "user_id": user_id,
-                "is_completed": False
-            }).to_list(length=None)
-            
-            if not tasks:
-                continue  # No pending tasks for this user
-            
-            pending_items = []
-            tomorrow = today + timedelta(days=1)
-            
-            for task in tasks:
-                due_date = task.get("due_date")
-                is_overdue = False
-                include_task = True
-                
-                if due_date:
-                    if isinstance(due_date, str):
-                        task_date = datetime.fromisoformat(due_date.replace("Z", "+00:00")).date()
-                    else:
-                        task_date = due_date.date() if isinstance(due_date, datetime) else due_date
-                    
-                    is_overdue = task_date < today
-                    include_task = task_date <= tomorrow
-                
-                if include_task:
-                    pending_items.append({
-                        "title": task["title"],
-                        "priority": task.get("priority", "medium"),
-                        "due_date": due_date.isoformat() if isinstance(due_date, datetime) else str(due_date) if due_date else "No date",
-                        "is_overdue": is_overdue,
-                        "category": task.get("category", "General")
-                    })
-        
-        # Generate AI message for this user
-        ai_message = None
-        try:
-            if request.notification_type == "habits":
-                prompt = f"""Generate a brief, encouraging message (1-2 sentences) for a user with {len(pending_items)} pending habits today. Make it warm and motivating."""
-            else:
-                overdue_count = sum(1 for item in pending_items if item.get("is_overdue"))
-                prompt = f"""Generate a brief, supportive message (1-2 sentences) for a user with {len(pending_items)} pending tasks ({overdue_count} overdue). Keep it positive and helpful."""
-            
-            groq_client = get_groq_client()
-            completion = groq_client.chat.completions.create(
-                model="llama-3.1-70b-versatile",
-                messages=[{"role": "user", "content": prompt}],
-                temperature=0.8,
-                max_tokens=100
-            )
-            ai_message = completion.choices[0].message.content.strip()
-        except:
-            pass  # Use default message if AI fails
-        
-        # Create email HTML
-        html_content = email_service.create_notification_email(
-            user_name=user.get("full_name", "User"),
-            notification_type=request.notification_type,
-            items=pending_items,
-            ai_message=ai_message
-        )
-        
-        emails_to_send.append({
-            "email": email,
-            "name": user.get("full_name", "User"),
-            "html_content": html_content,
-            "subject": f"🌿 {'Daily Habit' if request.notification_type == 'habits' else 'Task'} Reminder from MindGarden AI"
-        })
+        await run.queue(users, today)
+    
+    if not users_count:
+        raise HTTPException(status_code=404, detail="No users found")
     
-    if not emails_to_send:
+    if not run.email_count:
         return {
             "message": "No users have pending items to notify",
             "emails_sent": 0
         }
     
-    # Send all emails in background
-    async def send_all_emails():
-        results = {
-            "total": len(emails_to_send),
-            "sent": 0,
-            "failed": 0
-        }
-        
-        for email_data in emails_to_send:
-            try:
-                success = email_service.send_email(
-                    to_email=email_data["email"],
-                    subject=email_data["subject"],
-                    html_content=email_data["html_content"]
-                )
-                if success:
-                    results["sent"] += 1
-                else:
-                    results["failed"] += 1
-            except Exception as e:
-                results["failed"] += 1
-                print(f"Failed to send email to {email_data['email']}: {e}")
-        
-        return results
-    
-    background_tasks.add_task(send_all_emails)
-    
     return {
-        "message": f"Notification emails initiated for {len(emails_to_send)} users",
-        "email_count": len(emails_to_send),
-        "notification_type": request.notification_type
+        "message": f"Notification emails initiated for {run.email_count} users",
+        "email_count": run.email_count,
+        "notification_type": request.notification_type,
+        "batch_id": run.batch_id
     }
 
 
+@router.get("/batches/{batch_id}")
+async def get_email_batch(
+    batch_id: str,
+    current_user: User = Depends(get_current_user)
+):
+    """Get delivery status of a queued email batch"""
+    
+    status = await email_outbox.batch_status(batch_id, created_by=current_user.id)
+    if status is None:
+        raise HTTPException(status_code=404, detail="Batch not found")
+    
+    return status
+
+
 @router.post("/test-email")
 async def send_test_email(
     current_user: User = Depends(get_current_user)
@@ -312,7 +203,7 @@ async def send_test_email(
     html_content = html_content.replace("{{ frontend_url }}", "http://localhost:5173")
     
     try:
-        success = email_service.send_email(
+        success = await email_service.send_email_async(
             to_email=user_email,
             subject="🌿 Test Email from MindGarden AI",
             html_content=html_content
@@ -1,66 +1,63 @@
-from fastapi import APIRouter, HTTPException, Depends
+from fastapi import APIRouter, HTTPException, Depends, Request, Response
 from typing import List, Dict, Optional
 from datetime import datetime, date, timedelta
 from bson import ObjectId
 
 from ..models.schemas import Habit, HabitCreate, HabitUpdate, User
-from ..core.database import get_collection
+from ..core.database import get_collection, index_registry
 from ..api.auth import get_current_user
+from ..services.streak_service import streak_service
+from ..services.llm_client import llm_client
+from ..services.habit_calendar import habit_calendar_store, completion_date_filter, to_completion_datetime
+from ..services.resource_versions import resource_versions
+from ..services.user_writes import record_write
 
 router = APIRouter()
 
-async def calculate_habit_streak(user_id: str, habit_id: str) -> Dict[str, int]:
-    """Calculate current and longest streak for a habit"""
-    completions_collection = get_collection("habit_completions")
-    
-    # Get all completions for this habit, sorted by date descending
-    completions = await completions_collection.find(
-        {"user_id": ObjectId(user_id), "habit_id": ObjectId(habit_id)},
-        {"date": 1}
-    ).sort("date", -1).to_list(length=None)
+index_registry.index("habits", [("user_id", 1), ("is_active", 1)])
+index_registry.index("habit_completions", [("user_id", 1), ("habit_id", 1), ("date", 1)])
+index_registry.index("habit_completions", [("user_id", 1), ("date", 1)])
+index_registry.query("active habits", "habits", {"user_id": ObjectId(), "is_active": True})
+index_registry.query("habit completion on a day", "habit_completions", {
+    "user_id": ObjectId(),
+    "habit_id": ObjectId(),
+    "date": completion_date_filter(date.today())
+})
+index_registry.query("completions on a day", "habit_completions", {
+    "user_id": ObjectId(),
+    "date": completion_date_filter(date.today())
+})
+
+async def get_habit_completion_stats(user_id: str, habit_ids: List[ObjectId]) -> Dict[ObjectId, Dict]:
+    """
+    Get streaks and completion counts for many habits in one round trip.
     
-    if not completions:
-        return {"current_streak": 0, "longest_streak": 0}
+    The completion calendars of all habits are loaded with a single query and
+    streaks, totals, completed-today and this-week counts are computed from
+    their bitmaps, so the number of round trips does not grow with the habit count.
+    """
+    calendars = await habit_calendar_store.load_many(user_id, habit_ids)
     
-    # Calculate current streak (from today backwards)
-    current_streak = 0
     today = date.today()
-    check_date = today
-    
-    # Convert completion dates (ISO strings) to date objects for comparison
-    completion_dates = set()
-    for completion in completions:
-        if isinstance(completion["date"], str):
-            completion_dates.add(datetime.fromisoformat(completion["date"]).date())
-        else:
-            completion_dates.add(completion["date"])
-    
-    # Count consecutive days from today backwards
-    while check_date in completion_dates:
-        current_streak += 1
-        check_date -= timedelta(days=1)
-    
-    # Calculate longest streak
-    longest_streak = 0
-    temp_streak = 0
-    all_dates = sorted(completion_dates)
-    
-    if all_dates:
-        prev_date = all_dates[0] - timedelta(days=1)
-        for completion_date in all_dates:
-            if completion_date == prev_date + timedelta(days=1):
-                temp_streak += 1
-            else:
-                longest_streak = max(longest_streak, temp_streak)
-                temp_streak = 1
-            prev_date = completion_date
-        longest_streak = max(longest_streak, temp_streak)
-    
-    return {"current_streak": current_streak, "longest_streak": longest_streak}
+    week_ago = today - timedelta(days=7)
+    
+    stats = {}
+    for habit_id, calendar in calendars.items():
+        stats[habit_id] = {
+            **calendar.streaks(today),
+            "total_completions": calendar.total(),
+            "completed_today": today in calendar,
+            "completions_this_week": calendar.count_between(week_ago, today)
+        }
+    return stats
 
 @router.get("/", response_model=List[Habit])
-async def get_habits(current_user: User = Depends(get_current_user)):
+async def get_habits(request: Request, response: Response, current_user: User = Depends(get_current_user)):
     """Get all habits for the authenticated user"""
+    not_modified = await resource_versions.not_modified(request, response, current_user.id, "habits")
+    if not_modified:
+        return not_modified
+    
     habits_collection = get_collection("habits")
     
     # Find all habits for the current user
@@ -70,35 +67,16 @@ async def get_habits(current_user: User = Depends(get_current_user)):
          "target_days": 1, "is_active": 1, "created_at": 1}
     )
     
+    habits_data = await habits_cursor.to_list(length=None)
+    
+    # Streaks and completion counts for every habit from their calendars
+    habit_stats = await get_habit_completion_stats(
+        str(current_user.id), [habit_data["_id"] for habit_data in habits_data]
+    )
+    
     habits_list = []
-    async for habit_data in habits_cursor:
-        # Calculate streaks and total completions
-        streaks = await calculate_habit_streak(str(current_user.id), str(habit_data["_id"]))
-        
-        # Count total completions
-        completions_collection = get_collection("habit_completions")
-        total_completions = await completions_collection.count_documents({
-            "user_id": ObjectId(current_user.id),
-            "habit_id": habit_data["_id"]
-        })
-        
-        # Check if completed today
-        today = date.today()
-        today_str = today.isoformat()
-        completed_today = await completions_collection.find_one({
-            "user_id": ObjectId(current_user.id),
-            "habit_id": habit_data["_id"],
-            "date": today_str
-        }) is not None
-        
-        # Count completions this week (last 7 days)
-        week_ago = today - timedelta(days=7)
-        week_ago_str = week_ago.isoformat()
-        completions_this_week = await completions_collection.count_documents({
-            "user_id": ObjectId(current_user.id),
-            "habit_id": habit_data["_id"],
-            "date": {"$gte": week_ago_str, "$lte": today_str}
-        })
+    for habit_data in habits_data:
+        stats = habit_stats[habit_data["_id"]]
         
         habit = Habit(
             id=str(habit_data["_id"]),
@@ -108,15 +86,15 @@ async def get_habits(current_user: User = Depends(get_current_user)):
             target_per_week=habit_data.get("target_per_week", 1),
             category=habit_data.get("category"),
             target_days=habit_data.get("target_days"),
-            current_streak=streaks["current_streak"],
-            longest_streak=streaks["longest_streak"],
-            total_completions=total_completions,
-            completed_today=completed_today,
-            completions_this_week=completions_this_week,
+            current_streak=stats["current_streak"],
+            longest_streak=stats["longest_streak"],
+            total_completions=stats["total_completions"],
+            completed_today=stats["completed_today"],
+            completions_this_week=stats["completions_this_week"],
             is_active=habit_data.get("is_active", True),
             created_at=habit_data["created_at"],
             user_id=str(current_user.id),
-            streak=streaks["current_streak"]
+            streak=stats["current_streak"]
         )
         habits_list.append(habit)
     
@@ -136,6 +114,7 @@ async def create_habit(habit_data: HabitCreate, current_user: User = Depends(get
     # Insert into database
     result = await habits_collection.insert_one(habit_dict)
     habit_id = str(result.inserted_id)
+    await record_write(current_user.id, "habits", event="pending")
     
     # Return the created habit with basic Habit schema fields
     return {
@@ -169,13 +148,8 @@ async def get_habit(habit_id: str, current_user: User = Depends(get_current_user
     if not habit_data:
         raise HTTPException(status_code=404, detail="Habit not found")
     
-    # Calculate streaks and completions
-    streaks = await calculate_habit_streak(str(current_user.id), habit_id)
-    completions_collection = get_collection("habit_completions")
-    total_completions = await completions_collection.count_documents({
-        "user_id": ObjectId(current_user.id),
-        "habit_id": habit_object_id
-    })
+    # Streaks and completion count from the materialized streak state
+    streaks = await streak_service.get_streaks(str(current_user.id), habit_id)
     
     return Habit(
         id=str(habit_data["_id"]),
@@ -187,7 +161,7 @@ async def get_habit(habit_id: str, current_user: User = Depends(get_current_user
         target_days=habit_data.get("target_days"),
         current_streak=streaks["current_streak"],
         longest_streak=streaks["longest_streak"],
-        total_completions=total_completions,
+        total_completions=streaks["total_completions"],
         is_active=habit_data.get("is_active", True),
         created_at=habit_data["created_at"],
         user_id=str(current_user.id),
@@ -222,6 +196,7 @@ async def update_habit(habit_id: str, habit_data: HabitUpdate, current_user: Use
         {"_id": habit_object_id},
         {"$set": update_dict}
     )
+    await record_write(current_user.id, "habits", event="pending")
     
     # Return updated habit
     return await get_habit(habit_id, current_user)
@@ -247,9 +222,18 @@ async def delete_habit(habit_id: str, current_user: User = Depends(get_current_u
     if not existing_habit:
         raise HTTPException(status_code=404, detail="Habit not found")
     
+    # Days whose rollup loses this habit's completions
+    calendar = await habit_calendar_store.load(str(current_user.id), habit_id)
+    last_completion = calendar.latest()
+    completion_dates = calendar.dates_between(date.min, last_completion) if last_completion else set()
+    
     # Delete habit and its completions
     await habits_collection.delete_one({"_id": habit_object_id})
-    await completions_collection.delete_many({"habit_id": habit_object_id})
+    await completions_collection.delete_many({"user_id": ObjectId(current_user.id), "habit_id": habit_object_id})
+    await streak_service.delete_state(str(current_user.id), habit_id)
+    await habit_calendar_store.delete(str(current_user.id), habit_id)
+    window = (min(completion_dates), max(completion_dates)) if completion_dates else None
+    await record_write(current_user.id, "habits", event="pending", window=window)
     
     return {"message": "Habit deleted successfully"}
 
@@ -286,15 +270,12 @@ async def log_habit(habit_id: str, log_data: dict, current_user: User = Depends(
     
     completed = log_data.get("completed", True)
     
-    # Convert date to datetime for MongoDB storage
-    log_datetime = datetime.combine(log_date, datetime.min.time())
-    
     if completed:
         # Check if already completed for this date
         existing_completion = await completions_collection.find_one({
             "user_id": ObjectId(current_user.id),
             "habit_id": habit_object_id,
-            "date": log_datetime
+            "date": completion_date_filter(log_date)
         })
         
         if not existing_completion:
@@ -302,20 +283,29 @@ async def log_habit(habit_id: str, log_data: dict, current_user: User = Depends(
             completion_dict = {
                 "user_id": ObjectId(current_user.id),
                 "habit_id": habit_object_id,
-                "date": log_datetime,
+                "date": to_completion_datetime(log_date),
                 "completed_at": datetime.utcnow()
             }
             await completions_collection.insert_one(completion_dict)
+            await habit_calendar_store.set_completed(str(current_user.id), habit_id, log_date)
+            streaks = await streak_service.record_completion(str(current_user.id), habit_id, log_date)
+        else:
+            streaks = await streak_service.get_streaks(str(current_user.id), habit_id)
     else:
         # Remove completion if it exists
-        await completions_collection.delete_one({
+        result = await completions_collection.delete_one({
             "user_id": ObjectId(current_user.id),
             "habit_id": habit_object_id,
-            "date": log_datetime
+            "date": completion_date_filter(log_date)
         })
+        
+        if result.deleted_count:
+            await habit_calendar_store.set_completed(str(current_user.id), habit_id, log_date, completed=False)
+            streaks = await streak_service.remove_completion(str(current_user.id), habit_id, log_date)
+        else:
+            streaks = await streak_service.get_streaks(str(current_user.id), habit_id)
     
-    # Calculate new streak
-    streaks = await calculate_habit_streak(str(current_user.id), habit_id)
+    await record_write(current_user.id, "habits", [log_date], event="pending")
     
     return {
         "message": "Habit logged successfully",
@@ -355,7 +345,7 @@ async def complete_habit(habit_id: str, completion_date: Optional[date] = None,
     existing_completion = await completions_collection.find_one({
         "user_id": ObjectId(current_user.id),
         "habit_id": habit_object_id,
-        "date": completion_date
+        "date": completion_date_filter(completion_date)
     })
     
     if existing_completion:
@@ -365,14 +355,16 @@ async def complete_habit(habit_id: str, completion_date: Optional[date] = None,
     completion_dict = {
         "user_id": ObjectId(current_user.id),
         "habit_id": habit_object_id,
-        "date": completion_date,
+        "date": to_completion_datetime(completion_date),
         "completed_at": datetime.utcnow()
     }
     
     await completions_collection.insert_one(completion_dict)
+    await habit_calendar_store.set_completed(str(current_user.id), habit_id, completion_date)
     
-    # Calculate new streak
-    streaks = await calculate_habit_streak(str(current_user.id), habit_id)
+    # Update streak state incrementally
+    streaks = await streak_service.record_completion(str(current_user.id), habit_id, completion_date)
+    await record_write(current_user.id, "habits", [completion_date], event="pending")
     
     return {
         "message": "Habit completed successfully",
@@ -414,7 +406,7 @@ async def get_weekly_stats(current_user: User = Depends(get_current_user)):
             # Count completed habits for this day
             completed_count = await completions_collection.count_documents({
                 "user_id": ObjectId(current_user.id),
-                "date": current_date.isoformat()
+                "date": completion_date_filter(current_date)
             })
             
             weekly_stats.append({
@@ -444,14 +436,17 @@ async def uncomplete_habit(habit_id: str, completion_date: date, current_user: U
     result = await completions_collection.delete_one({
         "user_id": ObjectId(current_user.id),
         "habit_id": habit_object_id,
-        "date": completion_date
+        "date": completion_date_filter(completion_date)
     })
     
     if result.deleted_count == 0:
         raise HTTPException(status_code=404, detail="Completion record not found")
     
-    # Calculate updated streak
-    streaks = await calculate_habit_streak(str(current_user.id), habit_id)
+    await habit_calendar_store.set_completed(str(current_user.id), habit_id, completion_date, completed=False)
+    
+    # Update streak state incrementally
+    streaks = await streak_service.remove_completion(str(current_user.id), habit_id, completion_date)
+    await record_write(current_user.id, "habits", [completion_date], event="pending")
     
     return {
         "message": "Habit completion removed successfully",
@@ -465,9 +460,6 @@ async def uncomplete_habit(habit_id: str, completion_date: date, current_user: U
 async def get_consistency_suggestions(current_user: dict = Depends(get_current_user)):
     """Generate AI-powered consistency suggestions using Groq based on user's habit patterns"""
     try:
-        from groq import Groq
-        import os
-        from ..core.config import settings
         import json
         
         habits_collection = get_collection("habits")
@@ -540,7 +532,7 @@ async def get_consistency_suggestions(current_user: dict = Depends(get_current_u
         strongest_habit = None
         max_streak = 0
         for habit in habits:
-            streaks = await calculate_habit_streak(str(current_user.id), str(habit["_id"]))
+            streaks = await streak_service.get_streaks(str(current_user.id), str(habit["_id"]))
             if streaks["current_streak"] > max_streak:
                 max_streak = streaks["current_streak"]
                 strongest_habit = habit["name"]
@@ -576,13 +568,18 @@ Make insights:
 3. Encouraging and motivational
 4. Varied each time (don't repeat generic advice)"""
         
-        # Call Groq API
-        api_key = settings.groq_api_key or os.getenv("GROQ_API_KEY")
-        if not api_key:
-            raise ValueError("Groq API key not found")
-        
-        groq_client = Groq(api_key=api_key)
-        chat_completion = groq_client.chat.completions.create(
+        # Call Groq API (identical statistics reuse the previous suggestions)
+        ai_content = await llm_client.complete_cached(
+            "consistency-suggestions",
+            {
+                "habits": [[h["name"], h.get("frequency", [])] for h in habits[:5]],
+                "habits_count": len(habits),
+                "consistency_rate": consistency_rate,
+                "completions": [completion_count, total_scheduled],
+                "best_time": best_time,
+                "best_days": best_days_text,
+                "strongest_habit": [strongest_habit, max_streak]
+            },
             messages=[
                 {
                     "role": "system",
@@ -599,7 +596,7 @@ Make insights:
             response_format={"type": "json_object"}
         )
         
-        ai_response = json.loads(chat_completion.choices[0].message.content)
+        ai_response = json.loads(ai_content)
         
         return {
             "suggestions": ai_response.get("suggestions", []),
@@ -1,15 +1,23 @@
-from fastapi import APIRouter, HTTPException, status, Depends, Query
+from fastapi import APIRouter, HTTPException, status, Depends, Query, Request, Response
 from typing import List, Dict, Any, Optional
 from datetime import datetime, date, timedelta
 from bson import ObjectId
 from enum import Enum
 
 from ..models.schemas import MoodLog, MoodLogCreate, User
-from ..core.database import get_collection
+from ..core.database import get_collection, index_registry
 from ..api.auth import get_current_user
+from ..services.resource_versions import resource_versions
+from ..services.user_writes import record_write
 
 router = APIRouter()
 
+index_registry.index("mood_logs", [("user_id", 1), ("date", 1)])
+index_registry.query("mood logs in a period", "mood_logs", {
+    "user_id": ObjectId(),
+    "date": {"$gte": (date.today() - timedelta(days=30)).isoformat(), "$lte": date.today().isoformat()}
+}, sort=[("date", -1)])
+
 class MoodLevel(str, Enum):
     VERY_LOW = "very_low"
     LOW = "low"
@@ -55,6 +63,8 @@ async def log_mood(mood_data: MoodLogCreate, current_user: User = Depends(get_cu
         result = await mood_collection.insert_one(mood_dict)
         mood_id = str(result.inserted_id)
     
+    await record_write(current_user.id, "mood", [today])
+    
     # Return the created/updated mood log
     return MoodLog(
         id=mood_id,
@@ -68,12 +78,18 @@ async def log_mood(mood_data: MoodLogCreate, current_user: User = Depends(get_cu
 
 @router.get("/logs", response_model=List[MoodLog])
 async def get_mood_logs(
+    request: Request,
+    response: Response,
     current_user: User = Depends(get_current_user),
     days: int = Query(30, ge=1, le=365),
     start_date: Optional[date] = None,
     end_date: Optional[date] = None
 ):
     """Get mood logs for a date range"""
+    not_modified = await resource_versions.not_modified(request, response, current_user.id, "mood")
+    if not_modified:
+        return not_modified
+    
     mood_collection = get_collection("mood_logs")
     
     # Build date range query
@@ -112,10 +128,16 @@ async def get_mood_logs(
 
 @router.get("/timeline")
 async def get_mood_timeline(
+    request: Request,
+    response: Response,
     current_user: User = Depends(get_current_user),
     days: int = Query(7, ge=1, le=90)
 ):
     """Get mood timeline with daily averages"""
+    not_modified = await resource_versions.not_modified(request, response, current_user.id, "mood")
+    if not_modified:
+        return not_modified
+    
     mood_collection = get_collection("mood_logs")
     
     # Calculate date range
@@ -323,6 +345,8 @@ async def delete_mood_log(log_date: date, current_user: User = Depends(get_curre
     if result.deleted_count == 0:
         raise HTTPException(status_code=404, detail="Mood log not found for this date")
     
+    await record_write(current_user.id, "mood", [log_date])
+    
     return {"message": f"Mood log for {log_date.isoformat()} deleted successfully"}
 
 @router.get("/trends")
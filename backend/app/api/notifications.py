@@ -1,20 +1,30 @@
-from fastapi import APIRouter, Depends, BackgroundTasks
+import asyncio
+import json
+from fastapi import APIRouter, Depends, BackgroundTasks, Request, Response
+from fastapi.responses import StreamingResponse
 from typing import List, Dict
 from datetime import datetime, date, timedelta, time
 from bson import ObjectId
-import os
-from groq import Groq
 
 from ..models.schemas import User, NotificationPreference
-from ..core.database import get_collection
+from ..core.database import get_collection, index_registry
 from ..core.config import settings
 from ..api.auth import get_current_user
+from ..services.habit_calendar import completion_date_filter
+from ..services.llm_client import llm_client
+from ..services.notification_events import notification_events
+from ..services.resource_versions import resource_versions
+from ..services.notification_preferences import notification_preference_store
+from ..services.notification_scheduler import notification_scheduler
 
 router = APIRouter()
 
-def get_groq_client():
-    """Get Groq client with API key from settings"""
-    return Groq(api_key=settings.groq_api_key)
+index_registry.index("notification_snoozes", [("user_id", 1), ("notification_id", 1), ("snooze_until", 1)])
+index_registry.query("active snooze", "notification_snoozes", {
+    "user_id": ObjectId(),
+    "notification_id": "daily_summary",
+    "snooze_until": {"$gt": datetime.utcnow()}
+})
 
 @router.post("/preferences")
 async def update_notification_preferences(
@@ -23,24 +33,17 @@ async def update_notification_preferences(
 ):
     """Update user's notification preferences"""
     
-    notifications_collection = get_collection("notification_preferences")
-    user_id = ObjectId(current_user.id)
-    
     preference_data = {
-        "user_id": user_id,
         "habits_enabled": preferences.habits_enabled,
         "tasks_enabled": preferences.tasks_enabled,
         "habits_time": preferences.habits_time,  # e.g., "09:00"
         "tasks_time": preferences.tasks_time,    # e.g., "18:00"
-        "snooze_duration": preferences.snooze_duration or 30,  # minutes
-        "updated_at": datetime.utcnow()
+        "snooze_duration": preferences.snooze_duration or 30  # minutes
     }
     
-    await notifications_collection.update_one(
-        {"user_id": user_id},
-        {"$set": preference_data},
-        upsert=True
-    )
+    await notification_preference_store.save(current_user.id, preference_data)
+    await notification_scheduler.schedule_user(current_user.id, current_user.timezone, preference_data)
+    await notification_events.publish(current_user.id, "preferences", notification_preference_store.with_defaults(preference_data))
     
     return {"message": "Notification preferences updated successfully"}
 
@@ -50,40 +53,18 @@ async def get_notification_preferences(
 ):
     """Get user's notification preferences"""
     
-    notifications_collection = get_collection("notification_preferences")
-    user_id = ObjectId(current_user.id)
-    
-    preferences = await notifications_collection.find_one({"user_id": user_id})
+    preferences = await notification_preference_store.get(current_user.id)
     
-    if not preferences:
-        # Return defaults
-        return {
-            "habits_enabled": True,
-            "tasks_enabled": True,
-            "habits_time": "09:00",
-            "tasks_time": "18:00",
-            "snooze_duration": 30
-        }
-    
-    return {
-        "habits_enabled": preferences.get("habits_enabled", True),
-        "tasks_enabled": preferences.get("tasks_enabled", True),
-        "habits_time": preferences.get("habits_time", "09:00"),
-        "tasks_time": preferences.get("tasks_time", "18:00"),
-        "snooze_duration": preferences.get("snooze_duration", 30)
-    }
+    # Missing preferences fall back to the defaults
+    return notification_preference_store.with_defaults(preferences)
 
-@router.get("/pending")
-async def get_pending_notifications(
-    current_user: User = Depends(get_current_user)
-):
-    """Get pending habits and tasks for notifications"""
+async def _pending_notifications(user_id: ObjectId) -> Dict:
+    """Pending habits and tasks of a user for today"""
     
     habits_collection = get_collection("habits")
     habit_completions_collection = get_collection("habit_completions")
     tasks_collection = get_collection("tasks")
     
-    user_id = ObjectId(current_user.id)
     today = date.today()
     
     # Get incomplete habits for today
@@ -103,7 +84,7 @@ async def get_pending_notifications(
             completion = await habit_completions_collection.find_one({
                 "user_id": user_id,
                 "habit_id": habit["_id"],
-                "date": today.isoformat()
+                "date": completion_date_filter(today)
             })
             
             if not completion:
@@ -157,6 +138,77 @@ async def get_pending_notifications(
         "total_count": len(pending_habits) + len(pending_tasks)
     }
 
+@router.get("/pending")
+async def get_pending_notifications(
+    request: Request,
+    response: Response,
+    current_user: User = Depends(get_current_user)
+):
+    """Get pending habits and tasks for notifications"""
+    not_modified = await resource_versions.not_modified(request, response, current_user.id, "habits", "tasks")
+    if not_modified:
+        return not_modified
+    
+    return await _pending_notifications(ObjectId(current_user.id))
+
+def _sse_event(event: str, data) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+@router.get("/stream")
+async def stream_notifications(
+    request: Request,
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Push notification state as server-sent events.
+    
+    A ``pending`` event with the ``/pending`` payload is sent on connect,
+    whenever the user's habits or tasks change and when the day rolls over,
+    and a ``preferences`` event when their notification preferences are
+    saved. Nothing is queried while nothing changes; comment lines keep the
+    connection open.
+    """
+    user_id = ObjectId(current_user.id)
+    
+    async def events():
+        async with notification_events.subscribe(user_id) as queue:
+            pending_day = date.today()
+            yield _sse_event("pending", await _pending_notifications(user_id))
+            
+            while True:
+                # Wake at midnight too: pending items are counted for the current day
+                until_tomorrow = datetime.combine(pending_day + timedelta(days=1), time.min) - datetime.now()
+                timeout = min(settings.notification_stream_keepalive_seconds, max(1.0, until_tomorrow.total_seconds()))
+                try:
+                    message = await asyncio.wait_for(queue.get(), timeout=timeout)
+                except asyncio.TimeoutError:
+                    if await request.is_disconnected():
+                        return
+                    if date.today() != pending_day:
+                        pending_day = date.today()
+                        yield _sse_event("pending", await _pending_notifications(user_id))
+                    else:
+                        yield ": keepalive\n\n"
+                    continue
+                
+                # A burst of changes is answered with a single refresh
+                messages = [message]
+                while not queue.empty():
+                    messages.append(queue.get_nowait())
+                
+                if any(message["event"] == "pending" for message in messages):
+                    pending_day = date.today()
+                    yield _sse_event("pending", await _pending_notifications(user_id))
+                for message in messages:
+                    if message["event"] != "pending":
+                        yield _sse_event(message["event"], message["data"])
+    
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
 @router.post("/generate-reminder")
 async def generate_ai_reminder(
     notification_type: str,  # "habits" or "tasks"
@@ -187,7 +239,7 @@ async def generate_ai_reminder(
                 completion = await habit_completions_collection.find_one({
                     "user_id": user_id,
                     "habit_id": habit["_id"],
-                    "date": today.isoformat()
+                    "date": completion_date_filter(today)
                 })
                 
                 if not completion:
@@ -218,15 +270,14 @@ Create a short, encouraging message (2-3 sentences) that:
 Keep it under 100 words and make it feel personal."""
 
         try:
-            groq_client = get_groq_client()
-            completion = groq_client.chat.completions.create(
+            ai_message = (await llm_client.complete_cached(
+                "habit-reminder",
+                {"pending_habits": pending_habits},
                 model="llama-3.1-70b-versatile",
                 messages=[{"role": "user", "content": prompt}],
                 temperature=0.8,
                 max_tokens=200
-            )
-            
-            ai_message = completion.choices[0].message.content.strip()
+            )).strip()
             
             return {
                 "message": ai_message,
@@ -294,15 +345,18 @@ Create a short, motivating message (2-3 sentences) that:
 Keep it under 100 words."""
 
         try:
-            groq_client = get_groq_client()
-            completion = groq_client.chat.completions.create(
+            ai_message = (await llm_client.complete_cached(
+                "task-reminder",
+                {
+                    "overdue": [t["title"] for t in overdue_tasks[:3]],
+                    "due_today": [t["title"] for t in today_tasks[:3]],
+                    "counts": [len(overdue_tasks), len(today_tasks), len(tasks)]
+                },
                 model="llama-3.1-70b-versatile",
                 messages=[{"role": "user", "content": prompt}],
                 temperature=0.8,
                 max_tokens=200
-            )
-            
-            ai_message = completion.choices[0].message.content.strip()
+            )).strip()
             
             return {
                 "message": ai_message,
@@ -429,11 +483,10 @@ async def check_missed_items(
         frequency = habit.get("frequency", [])
         
         if yesterday_weekday in frequency or not frequency:
-            yesterday_datetime = datetime.combine(yesterday, datetime.min.time())
             completion = await habit_completions_collection.find_one({
                 "user_id": user_id,
                 "habit_id": habit["_id"],
-                "date": yesterday_datetime
+                "date": completion_date_filter(yesterday)
             })
             
             if not completion:
@@ -463,15 +516,18 @@ Create a caring, supportive message (2-3 sentences) that:
 Keep it under 120 words."""
 
         try:
-            groq_client = get_groq_client()
-            completion = groq_client.chat.completions.create(
+            ai_message = (await llm_client.complete_cached(
+                "missed-items",
+                {
+                    "critical_overdue": critical_overdue[:3],
+                    "missed_habits": missed_habits[:3],
+                    "counts": [len(critical_overdue), len(missed_habits)]
+                },
                 model="llama-3.1-70b-versatile",
                 messages=[{"role": "user", "content": prompt}],
                 temperature=0.8,
                 max_tokens=250
-            )
-            
-            ai_message = completion.choices[0].message.content.strip()
+            )).strip()
             
             return {
                 "has_missed_items": True,
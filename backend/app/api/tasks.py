@@ -1,15 +1,32 @@
-from fastapi import APIRouter, HTTPException, status, Depends, Query
+from fastapi import APIRouter, HTTPException, status, Depends, Query, Request, Response
 from typing import List, Dict, Any, Optional
 from datetime import datetime, date, timedelta
 from bson import ObjectId
 from enum import Enum
 
 from ..models.schemas import Task, TaskCreate, TaskUpdate, User
-from ..core.database import get_collection
+from ..core.database import get_collection, index_registry
 from ..api.auth import get_current_user
+from ..services.resource_versions import resource_versions
+from ..services.user_writes import record_write
 
 router = APIRouter()
 
+index_registry.index("tasks", [("user_id", 1), ("is_completed", 1), ("due_date", 1)])
+index_registry.index("tasks", [("user_id", 1), ("due_date", 1)])
+index_registry.index("tasks", [("user_id", 1), ("created_at", 1)])
+index_registry.index("tasks", [("user_id", 1), ("completed_at", 1)])
+index_registry.query("tasks by due date", "tasks", {"user_id": ObjectId()}, sort=[("due_date", 1)])
+index_registry.query("overdue tasks", "tasks", {
+    "user_id": ObjectId(),
+    "is_completed": False,
+    "due_date": {"$lt": datetime.utcnow()}
+})
+index_registry.query("tasks created in a period", "tasks", {
+    "user_id": ObjectId(),
+    "created_at": {"$gte": datetime.utcnow() - timedelta(days=30)}
+})
+
 class TaskStatus(str, Enum):
     PENDING = "pending"
     IN_PROGRESS = "in_progress"
@@ -22,8 +39,14 @@ class TaskPriority(str, Enum):
     HIGH = "high"
     URGENT = "urgent"
 
+def _day_of(value: Optional[datetime]) -> Optional[date]:
+    """Calendar day of a task timestamp, used to refresh the daily rollup"""
+    return value.date() if isinstance(value, datetime) else None
+
 @router.get("/", response_model=List[Task])
 async def get_tasks(
+    request: Request,
+    response: Response,
     current_user: User = Depends(get_current_user),
     status: Optional[TaskStatus] = None,
     priority: Optional[TaskPriority] = None,
@@ -33,6 +56,10 @@ async def get_tasks(
     offset: int = Query(0, ge=0)
 ):
     """Get all tasks for the authenticated user with filtering options"""
+    not_modified = await resource_versions.not_modified(request, response, current_user.id, "tasks")
+    if not_modified:
+        return not_modified
+    
     tasks_collection = get_collection("tasks")
     
     # Build filter query
@@ -99,6 +126,7 @@ async def create_task(task_data: TaskCreate, current_user: User = Depends(get_cu
     # Insert into database
     result = await tasks_collection.insert_one(task_dict)
     task_id = str(result.inserted_id)
+    await record_write(current_user.id, "tasks", [task_dict["created_at"].date()], event="pending")
     
     # Return the created task
     return Task(
@@ -185,6 +213,11 @@ async def update_task(task_id: str, task_data: TaskUpdate, current_user: User =
         {"_id": task_object_id},
         {"$set": update_dict}
     )
+    await record_write(current_user.id, "tasks", [
+        _day_of(existing_task.get("created_at")),
+        _day_of(existing_task.get("completed_at")),
+        _day_of(update_dict.get("completed_at"))
+    ], event="pending")
     
     # Return updated task
     return await get_task(task_id, current_user)
@@ -211,6 +244,10 @@ async def delete_task(task_id: str, current_user: User = Depends(get_current_use
     
     # Delete task
     await tasks_collection.delete_one({"_id": task_object_id})
+    await record_write(current_user.id, "tasks", [
+        _day_of(existing_task.get("created_at")),
+        _day_of(existing_task.get("completed_at"))
+    ], event="pending")
     
     return {"message": "Task deleted successfully"}
 
@@ -247,6 +284,10 @@ async def complete_task(task_id: str, current_user: User = Depends(get_current_u
             }
         }
     )
+    await record_write(current_user.id, "tasks", [
+        _day_of(existing_task.get("completed_at")),
+        completed_at.date()
+    ], event="pending")
     
     return {
         "message": "Task completed successfully",
@@ -286,6 +327,7 @@ async def uncomplete_task(task_id: str, current_user: User = Depends(get_current
             "$unset": {"completed_at": ""}
         }
     )
+    await record_write(current_user.id, "tasks", [_day_of(existing_task.get("completed_at"))], event="pending")
     
     return {
         "message": "Task marked as incomplete",
@@ -1,5 +1,8 @@
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Any, Callable, Dict, Optional
 from jose import JWTError, jwt
 import bcrypt
 from fastapi import HTTPException, status
@@ -21,10 +24,60 @@ def get_password_hash(password: str) -> str:
     """Generate password hash"""
     # Truncate password to 72 bytes for bcrypt
     password_bytes = password.encode('utf-8')[:72]
-    salt = bcrypt.gensalt()
+    salt = bcrypt.gensalt(rounds=settings.bcrypt_rounds)
     hashed = bcrypt.hashpw(password_bytes, salt)
     return hashed.decode('utf-8')
 
+class PasswordHashPool:
+    """
+    Dedicated, size-limited thread pool for bcrypt work.
+    
+    Hashing and verification cost hundreds of milliseconds of CPU, so they run
+    here instead of on the event loop. ``stats`` reports how many calls are
+    running and how many are queued behind them.
+    """
+    
+    def __init__(self, max_workers: int):
+        self.max_workers = max_workers
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="password-hash")
+        self.pending = 0
+        self.running = 0
+        self._lock = threading.Lock()
+    
+    def _call(self, func: Callable, *args) -> Any:
+        with self._lock:
+            self.running += 1
+        try:
+            return func(*args)
+        finally:
+            with self._lock:
+                self.running -= 1
+    
+    async def run(self, func: Callable, *args) -> Any:
+        self.pending += 1
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self.executor, self._call, func, *args)
+        finally:
+            self.pending -= 1
+    
+    def stats(self) -> Dict[str, int]:
+        running = self.running
+        return {
+            "workers": self.max_workers,
+            "running": running,
+            "queued": max(self.pending - running, 0)
+        }
+
+password_hash_pool = PasswordHashPool(max_workers=settings.password_hash_workers)
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """Verify a password on the password hashing pool"""
+    return await password_hash_pool.run(verify_password, plain_password, hashed_password)
+
+async def get_password_hash_async(password: str) -> str:
+    """Generate a password hash on the password hashing pool"""
+    return await password_hash_pool.run(get_password_hash, password)
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     """Create JWT access token"""
     to_encode = data.copy()
@@ -0,0 +1,197 @@
+import hashlib
+import json
+import time
+from collections import OrderedDict
+from datetime import date
+from typing import Any, Optional
+
+from .config import settings
+
+
+class CacheBackend:
+    """
+    Minimal async key/value interface used by the caches in this module.
+
+    The in-process backend below is the default; a shared store (e.g. Redis)
+    can be plugged in by implementing these methods. Counters are kept apart
+    from cached values and are never evicted.
+    """
+
+    async def get(self, key: str) -> Optional[Any]:
+        raise NotImplementedError
+
+    async def set(self, key: str, value: Any, ttl: float) -> None:
+        raise NotImplementedError
+
+    async def delete(self, key: str) -> None:
+        raise NotImplementedError
+
+    async def get_counter(self, key: str) -> int:
+        raise NotImplementedError
+
+    async def incr(self, key: str) -> int:
+        raise NotImplementedError
+
+
+class InMemoryCacheBackend(CacheBackend):
+    """Process-local cache with per-entry TTL and least-recently-used eviction"""
+
+    def __init__(self, max_entries: int = 1024):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._counters = {}
+
+    def get_sync(self, key: str) -> Optional[Any]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+    
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del self._entries[key]
+            return None
+    
+        self._entries.move_to_end(key)
+        return value
+
+    def set_sync(self, key: str, value: Any, ttl: float) -> None:
+        self._entries[key] = (time.monotonic() + ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def delete_sync(self, key: str) -> None:
+        self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._counters.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    async def get(self, key: str) -> Optional[Any]:
+        return self.get_sync(key)
+
+    async def set(self, key: str, value: Any, ttl: float) -> None:
+        self.set_sync(key, value, ttl)
+
+    async def delete(self, key: str) -> None:
+        self.delete_sync(key)
+
+    async def get_counter(self, key: str) -> int:
+        return self._counters.get(key, 0)
+
+    async def incr(self, key: str) -> int:
+        self._counters[key] = self._counters.get(key, 0) + 1
+        return self._counters[key]
+
+
+class CacheSlot:
+    """A cache key resolved once per request, so a result computed before an
+    invalidation is stored under the old generation and never served"""
+
+    def __init__(self, cache: "AnalyticsCache", key: str):
+        self.cache = cache
+        self.key = key
+
+    async def get(self) -> Optional[Any]:
+        return await self.cache.backend.get(self.key)
+
+    async def set(self, value: Any) -> None:
+        await self.cache.backend.set(self.key, value, self.cache.ttl)
+
+
+class AnalyticsCache:
+    """
+    Per-user cache for computed analytics responses.
+
+    Entries are keyed by user, endpoint and query parameters (plus the current
+    day, so results never outlive the date they were computed for). Each user
+    has a generation counter that is part of every key; write endpoints bump it
+    through ``invalidate_user`` so all of that user's entries become unreachable
+    at once and age out of the backend.
+    """
+
+    def __init__(self, backend: CacheBackend, ttl: float):
+        self.backend = backend
+        self.ttl = ttl
+
+    def configure_backend(self, backend: CacheBackend) -> None:
+        self.backend = backend
+
+    async def slot(self, user_id: str, endpoint: str, **params) -> CacheSlot:
+        """Resolve the cache slot for one analytics request"""
+        generation = await self.backend.get_counter(f"analytics:gen:{user_id}")
+        params = {**params, "day": date.today().isoformat()}
+        key = f"analytics:{user_id}:{generation}:{endpoint}:{json.dumps(params, sort_keys=True, default=str)}"
+        return CacheSlot(self, key)
+
+    async def invalidate_user(self, user_id: str) -> None:
+        """Drop every cached analytics result for a user"""
+        await self.backend.incr(f"analytics:gen:{user_id}")
+
+
+class UserCache:
+    """
+    Short-lived cache of resolved ``User`` objects for request authentication.
+
+    Entries hold validated model instances, so this cache is always process
+    local. Anything that changes a user document (profile, password, login)
+    must call ``invalidate``; the TTL bounds staleness for writes made by
+    other processes.
+    """
+
+    def __init__(self, backend: InMemoryCacheBackend, ttl: float):
+        self.backend = backend
+        self.ttl = ttl
+
+    def get(self, user_id: str) -> Optional[Any]:
+        return self.backend.get_sync(f"user:{user_id}")
+
+    def set(self, user_id: str, user: Any) -> None:
+        if self.ttl > 0:
+            self.backend.set_sync(f"user:{user_id}", user, self.ttl)
+
+    def invalidate(self, user_id: str) -> None:
+        self.backend.delete_sync(f"user:{user_id}")
+
+
+class ResponseCache:
+    """
+    Cache of generated responses keyed by a digest of the structured inputs
+    they were generated from, so identical states reuse an earlier response.
+    """
+
+    def __init__(self, backend: CacheBackend, ttl: float):
+        self.backend = backend
+        self.ttl = ttl
+
+    @staticmethod
+    def digest(namespace: str, inputs: Any) -> str:
+        """Stable key for a namespace and JSON-serializable inputs"""
+        payload = json.dumps(inputs, sort_keys=True, default=str, separators=(",", ":"))
+        return f"response:{namespace}:{hashlib.sha256(payload.encode('utf-8')).hexdigest()}"
+
+    async def get(self, namespace: str, inputs: Any) -> Optional[Any]:
+        return await self.backend.get(self.digest(namespace, inputs))
+
+    async def set(self, namespace: str, inputs: Any, value: Any) -> None:
+        if self.ttl > 0:
+            await self.backend.set(self.digest(namespace, inputs), value, self.ttl)
+
+
+analytics_cache = AnalyticsCache(
+    InMemoryCacheBackend(max_entries=settings.analytics_cache_max_entries),
+    ttl=settings.analytics_cache_ttl_seconds
+)
+
+user_cache = UserCache(
+    InMemoryCacheBackend(max_entries=settings.user_cache_max_entries),
+    ttl=settings.user_cache_ttl_seconds
+)
+
+llm_response_cache = ResponseCache(
+    InMemoryCacheBackend(max_entries=settings.llm_cache_max_entries),
+    ttl=settings.llm_cache_ttl_seconds
+)
@@ -5,12 +5,26 @@ class Settings(BaseSettings):
     # Database
     mongodb_url: str
     database_name: str = "mindgarden"
+    query_concurrency: int = 8  # max concurrent queries per gather_queries call
+    index_diagnostics: bool = False  # explain canonical queries on startup and flag COLLSCANs
+    mongo_max_pool_size: int = 100  # per process; size against the number of uvicorn workers
+    mongo_min_pool_size: int = 0
+    mongo_max_idle_time_ms: Optional[int] = None
+    mongo_server_selection_timeout_ms: int = 5000
+    mongo_read_preference: str = "primary"
+    readiness_timeout_seconds: float = 2.0
     
     # Authentication
     secret_key: str
     jwt_secret_key: str
     algorithm: str = "HS256"
     access_token_expire_minutes: int = 30
+    user_cache_ttl_seconds: int = 60  # 0 disables caching of authenticated users
+    user_cache_max_entries: int = 4096
+    preference_cache_ttl_seconds: int = 300  # 0 disables caching of notification preferences
+    preference_cache_max_entries: int = 16384
+    bcrypt_rounds: int = 12  # lower (min 4) only for load tests
+    password_hash_workers: int = 2
     
     # Google OAuth
     google_client_id: Optional[str] = None
@@ -22,6 +36,19 @@ class Settings(BaseSettings):
     
     # Groq AI
     groq_api_key: Optional[str] = None
+    llm_timeout_seconds: float = 20.0
+    llm_max_concurrency: int = 8  # concurrent LLM calls per process
+    llm_max_retries: int = 2
+    llm_retry_backoff_seconds: float = 0.5
+    llm_cache_ttl_seconds: int = 1800  # 0 disables reuse of generated messages
+    llm_cache_max_entries: int = 2048
+    llm_provider: str = "groq"  # "fake" serves canned responses locally for benchmarks
+    llm_fake_latency_ms: float = 800
+    llm_fake_latency_spread_ms: float = 300
+    llm_fake_latency_distribution: str = "normal"  # fixed, uniform, normal or lognormal
+    llm_fake_failure_rate: float = 0.0
+    llm_fake_responses_file: Optional[str] = None  # JSON object of prompt marker -> response
+    llm_fake_seed: Optional[int] = None
     
     # Email Configuration
     smtp_server: str = "smtp.gmail.com"
@@ -30,6 +57,29 @@ class Settings(BaseSettings):
     smtp_password: Optional[str] = None
     from_email: Optional[str] = None
     from_name: str = "MindGarden AI"
+    smtp_pool_size: int = 3  # authenticated connections kept open per process
+    smtp_pool_max_idle_seconds: float = 60.0  # servers drop idle sessions; reconnect after this
+    smtp_send_rate_per_second: float = 10.0
+    smtp_send_burst: int = 20
+    smtp_timeout_seconds: float = 15.0  # socket timeout for each SMTP operation
+    smtp_send_timeout_seconds: float = 30.0  # warn when one message, including reconnects, takes longer
+    
+    # Email outbox worker
+    email_worker_concurrency: int = 3  # messages in flight per worker process
+    email_outbox_poll_interval_seconds: float = 2.0
+    email_outbox_lease_seconds: int = 120  # a claimed message is retried by another worker after this
+    email_outbox_max_attempts: int = 5
+    email_outbox_retry_backoff_seconds: float = 30.0  # doubles after each failed attempt
+    notification_batch_size: int = 500  # users loaded per round of notification email queries
+    notification_schedule_grace_minutes: int = 30  # scheduled reminders later than this are skipped
+    notification_stream_keepalive_seconds: float = 25.0  # comment sent on idle event streams
+    notification_events_queue_size: int = 16  # per connected client; oldest events are dropped beyond this
+    notification_events_capped_bytes: int = 16 * 1024 * 1024
+    notification_events_retry_seconds: float = 1.0
+    
+    # Analytics cache
+    analytics_cache_ttl_seconds: int = 300
+    analytics_cache_max_entries: int = 2048
     
     # CORS
     frontend_url: str = "https://frontend-two-pi-49.vercel.app"
@@ -1,8 +1,65 @@
+import asyncio
+import threading
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Tuple
 from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import IndexModel
+from pymongo.errors import PyMongoError
+from pymongo.monitoring import ConnectionPoolListener
 from .config import settings
 
+class PoolMonitor(ConnectionPoolListener):
+    """
+    Tracks checked-out connections and waiting checkouts across the client's pools.
+    
+    Listeners are called from pymongo's worker threads, so updates are locked.
+    """
+    
+    def __init__(self):
+        self.checked_out = 0
+        self.waiting = 0
+        self._lock = threading.Lock()
+    
+    def connection_check_out_started(self, event):
+        with self._lock:
+            self.waiting += 1
+    
+    def connection_check_out_failed(self, event):
+        with self._lock:
+            self.waiting -= 1
+    
+    def connection_checked_out(self, event):
+        with self._lock:
+            self.waiting -= 1
+            self.checked_out += 1
+    
+    def connection_checked_in(self, event):
+        with self._lock:
+            self.checked_out -= 1
+    
+    def pool_created(self, event):
+        pass
+    
+    def pool_ready(self, event):
+        pass
+    
+    def pool_cleared(self, event):
+        pass
+    
+    def pool_closed(self, event):
+        pass
+    
+    def connection_created(self, event):
+        pass
+    
+    def connection_ready(self, event):
+        pass
+    
+    def connection_closed(self, event):
+        pass
+
 class Database:
     client: AsyncIOMotorClient = None
+    pool_monitor: PoolMonitor = None
 
 database = Database()
 
@@ -11,7 +68,16 @@ async def get_database() -> AsyncIOMotorClient:
 
 async def connect_to_mongo():
     """Create database connection"""
-    database.client = AsyncIOMotorClient(settings.mongodb_url)
+    database.pool_monitor = PoolMonitor()
+    database.client = AsyncIOMotorClient(
+        settings.mongodb_url,
+        maxPoolSize=settings.mongo_max_pool_size,
+        minPoolSize=settings.mongo_min_pool_size,
+        maxIdleTimeMS=settings.mongo_max_idle_time_ms,
+        serverSelectionTimeoutMS=settings.mongo_server_selection_timeout_ms,
+        readPreference=settings.mongo_read_preference,
+        event_listeners=[database.pool_monitor]
+    )
     print("Connected to MongoDB.")
 
 async def close_mongo_connection():
@@ -19,6 +85,113 @@ async def close_mongo_connection():
     database.client.close()
     print("Disconnected from MongoDB")
 
+async def check_readiness() -> Dict[str, Any]:
+    """Ping the database and report connection pool usage"""
+    pool = {
+        "max_size": settings.mongo_max_pool_size,
+        "checked_out": database.pool_monitor.checked_out if database.pool_monitor else 0,
+        "waiting": database.pool_monitor.waiting if database.pool_monitor else 0
+    }
+    pool["saturation"] = round(pool["checked_out"] / pool["max_size"], 2) if pool["max_size"] else 0
+    
+    if database.client is None:
+        return {"ready": False, "database": "not connected", "pool": pool}
+    
+    try:
+        await asyncio.wait_for(database.client.admin.command("ping"), timeout=settings.readiness_timeout_seconds)
+    except (asyncio.TimeoutError, PyMongoError) as e:
+        return {"ready": False, "database": f"unreachable: {str(e) or 'ping timed out'}", "pool": pool}
+    
+    # Requests queueing behind a full pool would only add to the backlog
+    exhausted = pool["checked_out"] >= pool["max_size"] and pool["waiting"] > 0
+    return {"ready": not exhausted, "database": "ok", "pool": pool}
+
 def get_collection(collection_name: str):
     """Get a specific collection from the database"""
-    return database.client[settings.database_name][collection_name]
\ No newline at end of file
+    return database.client[settings.database_name][collection_name]
+
+async def gather_queries(*operations: Callable[[], Awaitable[Any]], limit: Optional[int] = None) -> List[Any]:
+    """
+    Run independent database operations concurrently.
+    
+    Each operation is a zero-argument callable such as
+    ``lambda: collection.count_documents(...)``. Motor starts a query as soon
+    as it is called, so operations are only called once they hold one of
+    ``limit`` slots (default: ``settings.query_concurrency``); a single
+    request cannot monopolize the connection pool. Results are returned in
+    the order the operations were given.
+    """
+    semaphore = asyncio.BoundedSemaphore(limit or settings.query_concurrency)
+    
+    async def run(operation: Callable[[], Awaitable[Any]]) -> Any:
+        async with semaphore:
+            return await operation()
+    
+    return await asyncio.gather(*(run(operation) for operation in operations))
+
+async def cursor_batches(cursor, batch_size: int) -> AsyncIterator[List[Any]]:
+    """Group the documents of a cursor into lists of up to ``batch_size``"""
+    batch = []
+    async for document in cursor:
+        batch.append(document)
+        if len(batch) == batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+def _plan_stages(plan: Dict) -> List[str]:
+    """Flatten the stage names of an explain() plan tree"""
+    stages = [plan["stage"]] if "stage" in plan else []
+    for child in [plan.get("inputStage"), plan.get("queryPlan"), *plan.get("inputStages", [])]:
+        if child:
+            stages.extend(_plan_stages(child))
+    return stages
+
+class IndexRegistry:
+    """
+    Declarative indexes and canonical queries, contributed by routers and services.
+    
+    Modules register the indexes their hot filters rely on with ``index`` and a
+    representative query with ``query`` at import time. ``apply`` creates the
+    indexes on startup (``create_indexes`` is a no-op for indexes that already
+    exist), and ``verify`` runs ``explain()`` on every canonical query and
+    reports the ones whose winning plan is a collection scan.
+    """
+    
+    def __init__(self):
+        self.indexes: Dict[str, List[IndexModel]] = {}
+        self.queries: List[Tuple[str, str, Dict, Optional[List]]] = []
+    
+    def index(self, collection_name: str, keys: List[Tuple[str, int]], **options) -> None:
+        self.indexes.setdefault(collection_name, []).append(IndexModel(keys, **options))
+    
+    def query(self, name: str, collection_name: str, filter: Dict, sort: Optional[List[Tuple[str, int]]] = None) -> None:
+        self.queries.append((name, collection_name, filter, sort))
+    
+    async def apply(self) -> None:
+        """Create every registered index; failures are logged and do not stop startup"""
+        for collection_name, indexes in self.indexes.items():
+            try:
+                created = await get_collection(collection_name).create_indexes(indexes)
+                print(f"Indexes ready on {collection_name}: {', '.join(created)}")
+            except PyMongoError as e:
+                print(f"Failed to create indexes on {collection_name}: {str(e)}")
+    
+    async def verify(self) -> List[str]:
+        """Explain each canonical query and return the names of those that scan a collection"""
+        collection_scans = []
+        for name, collection_name, filter, sort in self.queries:
+            cursor = get_collection(collection_name).find(filter)
+            if sort:
+                cursor = cursor.sort(sort)
+            explanation = await cursor.explain()
+            stages = _plan_stages(explanation["queryPlanner"]["winningPlan"])
+            if "COLLSCAN" in stages:
+                collection_scans.append(name)
+                print(f"COLLSCAN: {name} on {collection_name} ({' <- '.join(stages)})")
+            else:
+                print(f"OK: {name} on {collection_name} ({' <- '.join(stages)})")
+        return collection_scans
+
+index_registry = IndexRegistry()
@@ -3,7 +3,11 @@ from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 
 from .core.config import settings
-from .core.database import connect_to_mongo, close_mongo_connection
+from .core.database import connect_to_mongo, close_mongo_connection, index_registry, check_readiness
+from .core.auth import password_hash_pool
+from .services.llm_client import llm_client
+from .services.email_service import email_service
+from .services.notification_events import notification_events
 from .api.auth import router as auth_router
 from .api.habits import router as habits_router
 from .api.tasks import router as tasks_router
@@ -45,9 +49,18 @@ app.add_middleware(
 @app.on_event("startup")
 async def startup_event():
     await connect_to_mongo()
+    await index_registry.apply()
+    # Before serving writes: publishing into a missing collection would create it uncapped
+    await notification_events.ensure_collection()
+    if settings.index_diagnostics:
+        await index_registry.verify()
 
 @app.on_event("shutdown")
 async def shutdown_event():
+    await llm_client.close()
+    await notification_events.close()
+    email_service.executor.shutdown(wait=False)
+    email_service.pool.close()
     await close_mongo_connection()
 
 # Health check
@@ -55,6 +68,19 @@ async def shutdown_event():
 async def health_check():
     return {"status": "healthy", "service": "MindGarden AI API"}
 
+@app.get("/health/ready")
+async def readiness_check():
+    readiness = await check_readiness()
+    return JSONResponse(
+        status_code=200 if readiness["ready"] else 503,
+        content={
+            "status": "ready" if readiness["ready"] else "unavailable",
+            "service": "MindGarden AI API",
+            **readiness,
+            "password_hash_pool": password_hash_pool.stats()
+        }
+    )
+
 # Root endpoint
 @app.get("/")
 async def root():
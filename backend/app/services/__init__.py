@@ -2,6 +2,15 @@
 Services module for MindGarden AI backend
 """
 
+from .daily_stats import daily_stats_service
+from .email_outbox import email_outbox
 from .email_service import email_service
+from .habit_calendar import habit_calendar_store
+from .llm_client import llm_client
+from .notification_events import notification_events
+from .notification_preferences import notification_preference_store
+from .notification_scheduler import notification_scheduler
+from .resource_versions import resource_versions
+from .streak_service import streak_service
 
-__all__ = ['email_service']
+__all__ = ['daily_stats_service', 'email_outbox', 'email_service', 'habit_calendar_store', 'llm_client', 'notification_events', 'notification_preference_store', 'notification_scheduler', 'resource_versions', 'streak_service']
@@ -0,0 +1,226 @@
+from typing import Dict, Iterable, List, Optional
+from datetime import datetime, date, timedelta
+from bson import ObjectId
+from pymongo import ReplaceOne
+
+from ..core.database import get_collection, gather_queries, index_registry
+
+MOOD_SCORE_EXPRESSION = {
+    "$switch": {
+        "branches": [
+            {"case": {"$eq": ["$mood", "very_low"]}, "then": 1},
+            {"case": {"$eq": ["$mood", "low"]}, "then": 2},
+            {"case": {"$eq": ["$mood", "neutral"]}, "then": 3},
+            {"case": {"$eq": ["$mood", "good"]}, "then": 4},
+            {"case": {"$eq": ["$mood", "very_good"]}, "then": 5}
+        ],
+        "default": 3
+    }
+}
+
+
+def _day_key(field: str) -> Dict:
+    """Aggregation expression for the YYYY-MM-DD day of a datetime or ISO string field"""
+    return {"$cond": [
+        {"$eq": [{"$type": field}, "string"]},
+        {"$substrCP": [field, 0, 10]},
+        {"$dateToString": {"format": "%Y-%m-%d", "date": field}}
+    ]}
+
+
+def _datetime_range(start: date, end: date) -> Dict:
+    return {
+        "$gte": datetime.combine(start, datetime.min.time()),
+        "$lte": datetime.combine(end, datetime.max.time())
+    }
+
+
+class DailyStatsService:
+    """
+    Pre-aggregated per-user, per-day activity in ``daily_user_stats``.
+
+    Each document holds one day's habit completions, tasks created and
+    completed, and the mood score and energy logged that day, so long-range
+    analytics read at most one small document per day instead of scanning raw
+    events. Write endpoints call ``refresh_days`` for the days they touched;
+    a day is always recomputed from the raw collections, which keeps the
+    rollup idempotent. A document with ``date: None`` marks a user whose
+    history has been backfilled; users without it are rebuilt on first read.
+    """
+
+    collection_name = "daily_user_stats"
+
+    async def _aggregate_days(self, user_id: ObjectId, start: Optional[date], end: Optional[date]) -> Dict[str, Dict]:
+        """Summarize raw events per day, optionally within an inclusive date window"""
+        completion_match = {"user_id": user_id}
+        mood_match = {"user_id": user_id}
+        created_match = {"user_id": user_id}
+        completed_match = {"user_id": user_id, "is_completed": True}
+        if start is not None:
+            # Completions and mood logs may be dated with datetimes or ISO strings
+            either_encoding = [
+                {"date": _datetime_range(start, end)},
+                {"date": {"$gte": start.isoformat(), "$lte": end.isoformat()}}
+            ]
+            completion_match["$or"] = either_encoding
+            mood_match["$or"] = either_encoding
+            created_match["created_at"] = _datetime_range(start, end)
+            completed_match["completed_at"] = _datetime_range(start, end)
+
+        completions, created, completed, moods = await gather_queries(
+            lambda: get_collection("habit_completions").aggregate([
+                {"$match": completion_match},
+                {"$group": {"_id": _day_key("$date"), "count": {"$sum": 1}}}
+            ]).to_list(length=None),
+            lambda: get_collection("tasks").aggregate([
+                {"$match": created_match},
+                {"$group": {"_id": _day_key("$created_at"), "count": {"$sum": 1}}}
+            ]).to_list(length=None),
+            lambda: get_collection("tasks").aggregate([
+                {"$match": completed_match},
+                {"$group": {"_id": _day_key("$completed_at"), "count": {"$sum": 1}}}
+            ]).to_list(length=None),
+            lambda: get_collection("mood_logs").aggregate([
+                {"$match": mood_match},
+                {"$group": {
+                    "_id": _day_key("$date"),
+                    "mood_logs": {"$sum": 1},
+                    "mood_score": {"$avg": MOOD_SCORE_EXPRESSION},
+                    "energy": {"$avg": "$energy"}
+                }}
+            ]).to_list(length=None)
+        )
+
+        days = {}
+
+        def day(key: str) -> Dict:
+            return days.setdefault(key, {
+                "habit_completions": 0,
+                "tasks_created": 0,
+                "tasks_completed": 0,
+                "mood_logs": 0,
+                "mood_score": None,
+                "energy": None
+            })
+
+        for group in completions:
+            day(group["_id"])["habit_completions"] = group["count"]
+        for group in created:
+            day(group["_id"])["tasks_created"] = group["count"]
+        for group in completed:
+            day(group["_id"])["tasks_completed"] = group["count"]
+        for group in moods:
+            day(group["_id"]).update({
+                "mood_logs": group["mood_logs"],
+                "mood_score": group["mood_score"],
+                "energy": group["energy"]
+            })
+
+        return days
+
+    async def _write_days(self, user_id: ObjectId, start: Optional[date], end: Optional[date]) -> int:
+        """Recompute and store every day in a window (or the whole history when unbounded)"""
+        days = await self._aggregate_days(user_id, start, end)
+        collection = get_collection(self.collection_name)
+
+        now = datetime.utcnow()
+        day_dates = []
+        operations = []
+        for key, stats in days.items():
+            day_date = datetime.combine(date.fromisoformat(key), datetime.min.time())
+            day_dates.append(day_date)
+            operations.append(ReplaceOne(
+                {"user_id": user_id, "date": day_date},
+                {"user_id": user_id, "date": day_date, **stats, "updated_at": now},
+                upsert=True
+            ))
+        if operations:
+            await collection.bulk_write(operations, ordered=False)
+
+        # Days in the window without any events left
+        stale_filter = {"$nin": day_dates}
+        if start is not None:
+            stale_filter.update(_datetime_range(start, end))
+        else:
+            stale_filter["$ne"] = None
+        await collection.delete_many({"user_id": user_id, "date": stale_filter})
+
+        return len(operations)
+
+    async def refresh_days(self, user_id: str, days: Iterable[Optional[date]]) -> None:
+        """Recompute the rollup for the days touched by a write"""
+        user_object_id = ObjectId(user_id)
+        await gather_queries(*[
+            lambda day=day: self._write_days(user_object_id, day, day)
+            for day in {day for day in days if day is not None}
+        ])
+
+    async def refresh_range(self, user_id: str, start: date, end: date) -> None:
+        """Recompute the rollup for every day in an inclusive date window"""
+        await self._write_days(ObjectId(user_id), start, end)
+
+    async def rebuild(self, user_id: str) -> int:
+        """Rebuild a user's whole rollup from raw events; returns the number of active days"""
+        user_object_id = ObjectId(user_id)
+        days_written = await self._write_days(user_object_id, None, None)
+        await get_collection(self.collection_name).update_one(
+            {"user_id": user_object_id, "date": None},
+            {"$set": {"built_at": datetime.utcnow()}},
+            upsert=True
+        )
+        return days_written
+
+    async def mark_stale(self, user_id: str) -> None:
+        """Drop a user's backfill marker so the whole rollup is rebuilt on its next read"""
+        await get_collection(self.collection_name).delete_one({"user_id": ObjectId(user_id), "date": None})
+
+    async def load(self, user_id: str, start: date, end: date) -> List[Dict]:
+        """Daily rollup documents in an inclusive date window, oldest first"""
+        user_object_id = ObjectId(user_id)
+        documents = await get_collection(self.collection_name).find({
+            "user_id": user_object_id,
+            "$or": [{"date": None}, {"date": _datetime_range(start, end)}]
+        }).to_list(length=None)
+
+        if not any(document.get("date") is None for document in documents):
+            await self.rebuild(user_id)
+            documents = await get_collection(self.collection_name).find({
+                "user_id": user_object_id,
+                "date": _datetime_range(start, end)
+            }).to_list(length=None)
+
+        return sorted(
+            (document for document in documents if document.get("date") is not None),
+            key=lambda document: document["date"]
+        )
+
+    def summarize(self, documents: Iterable[Dict]) -> Dict:
+        """Totals and mood/energy averages over a set of daily documents"""
+        totals = {
+            "habit_completions": 0,
+            "tasks_created": 0,
+            "tasks_completed": 0,
+            "mood_logs": 0
+        }
+        mood_total = 0
+        energy_total = 0
+        for document in documents:
+            for field in totals:
+                totals[field] += document.get(field, 0)
+            if document.get("mood_logs"):
+                mood_total += document["mood_score"] * document["mood_logs"]
+                energy_total += (document["energy"] or 0) * document["mood_logs"]
+
+        totals["average_mood"] = mood_total / totals["mood_logs"] if totals["mood_logs"] else 0
+        totals["average_energy"] = energy_total / totals["mood_logs"] if totals["mood_logs"] else 0
+        return totals
+
+
+# Singleton instance
+daily_stats_service = DailyStatsService()
+
+index_registry.index(DailyStatsService.collection_name, [("user_id", 1), ("date", 1)], unique=True)
+index_registry.query("daily stats in a period", DailyStatsService.collection_name, {
+    "user_id": ObjectId(),
+    "date": _datetime_range(date.today() - timedelta(days=365), date.today())
+})
@@ -0,0 +1,196 @@
+import asyncio
+import os
+import socket
+from typing import Dict, List, Optional
+from datetime import datetime, timedelta
+from bson import ObjectId
+from pymongo import ReturnDocument
+
+from ..core.config import settings
+from ..core.database import get_collection, index_registry
+from .email_service import email_service
+
+PENDING = "pending"
+SENDING = "sending"
+SENT = "sent"
+FAILED = "failed"
+
+
+class EmailOutbox:
+    """
+    Durable queue of outgoing emails in ``email_outbox``.
+
+    API endpoints enqueue one document per message under a batch id and
+    return immediately; the standalone worker (``email_worker.py``) claims
+    messages atomically, sends them through ``EmailService`` and records the
+    outcome. A claim is a lease with its own ``lease_id``: a message whose
+    worker died mid-send becomes claimable again once ``locked_until``
+    passes, so a batch resumes after a crash, and an outcome is only recorded
+    by the holder of the current lease. Failed sends are retried with
+    exponential backoff until ``settings.email_outbox_max_attempts`` is
+    reached; a message whose last lease expires is failed rather than
+    retried forever.
+    """
+
+    collection_name = "email_outbox"
+
+    async def enqueue(
+        self,
+        messages: List[Dict],
+        kind: str,
+        created_by: Optional[str] = None,
+        batch_id: Optional[str] = None
+    ) -> str:
+        """Queue pre-rendered messages, adding to ``batch_id`` if given; returns the batch id"""
+        batch_id = batch_id or str(ObjectId())
+        now = datetime.utcnow()
+        documents = [
+            {
+                "batch_id": batch_id,
+                "kind": kind,
+                "created_by": created_by,
+                "email": message.get("email"),
+                "subject": message["subject"],
+                "html_content": message["html_content"],
+                "status": PENDING,
+                "attempts": 0,
+                "next_attempt_at": now,
+                "locked_until": None,
+                "last_error": None,
+                "created_at": now,
+                "updated_at": now
+            }
+            for message in messages
+        ]
+        if documents:
+            await get_collection(self.collection_name).insert_many(documents, ordered=False)
+        return batch_id
+
+    async def claim(self, worker_id: str) -> Optional[Dict]:
+        """Atomically lease the next due message, or return None when the queue is idle"""
+        now = datetime.utcnow()
+        return await get_collection(self.collection_name).find_one_and_update(
+            {"$or": [
+                {"status": PENDING, "next_attempt_at": {"$lte": now}},
+                # Lease expired: the worker sending it crashed, hung or was stopped
+                {"status": SENDING, "locked_until": {"$lte": now}, "attempts": {"$lt": settings.email_outbox_max_attempts}}
+            ]},
+            {
+                "$set": {
+                    "status": SENDING,
+                    "worker_id": worker_id,
+                    "lease_id": str(ObjectId()),
+                    "locked_until": now + timedelta(seconds=settings.email_outbox_lease_seconds),
+                    "updated_at": now
+                },
+                "$inc": {"attempts": 1}
+            },
+            return_document=ReturnDocument.AFTER
+        )
+
+    async def fail_expired(self) -> int:
+        """Fail messages whose last allowed attempt lost its lease; returns how many"""
+        now = datetime.utcnow()
+        result = await get_collection(self.collection_name).update_many(
+            {"status": SENDING, "locked_until": {"$lte": now}, "attempts": {"$gte": settings.email_outbox_max_attempts}},
+            {"$set": {"status": FAILED, "locked_until": None, "last_error": "Lease expired", "updated_at": now}}
+        )
+        return result.modified_count
+
+    async def mark_sent(self, job: Dict) -> None:
+        now = datetime.utcnow()
+        await get_collection(self.collection_name).update_one(
+            # A sender that outlived its lease must not overwrite the new holder's outcome
+            {"_id": job["_id"], "lease_id": job["lease_id"]},
+            {"$set": {"status": SENT, "sent_at": now, "locked_until": None, "last_error": None, "updated_at": now}}
+        )
+
+    async def mark_failed(self, job: Dict, error: str) -> None:
+        """Schedule a retry with exponential backoff, or give up after the last attempt"""
+        now = datetime.utcnow()
+        update = {"locked_until": None, "last_error": error, "updated_at": now}
+        if job["attempts"] >= settings.email_outbox_max_attempts:
+            update["status"] = FAILED
+        else:
+            delay = settings.email_outbox_retry_backoff_seconds * (2 ** (job["attempts"] - 1))
+            update["status"] = PENDING
+            update["next_attempt_at"] = now + timedelta(seconds=delay)
+        await get_collection(self.collection_name).update_one(
+            {"_id": job["_id"], "lease_id": job["lease_id"]},
+            {"$set": update}
+        )
+
+    async def batch_status(self, batch_id: str, created_by: Optional[str] = None) -> Optional[Dict]:
+        """Message counts per delivery status for one batch, or None if it does not exist"""
+        match = {"batch_id": batch_id}
+        if created_by is not None:
+            match["created_by"] = created_by
+
+        groups = await get_collection(self.collection_name).aggregate([
+            {"$match": match},
+            {"$group": {"_id": "$status", "count": {"$sum": 1}}}
+        ]).to_list(length=None)
+        if not groups:
+            return None
+
+        counts = {PENDING: 0, SENDING: 0, SENT: 0, FAILED: 0}
+        for group in groups:
+            counts[group["_id"]] = group["count"]
+        return {"batch_id": batch_id, "total": sum(counts.values()), **counts}
+
+    async def _send(self, job: Dict) -> None:
+        if not job.get("email"):
+            # Nothing to retry; fail the message right away
+            job["attempts"] = settings.email_outbox_max_attempts
+            await self.mark_failed(job, "No email provided")
+            return
+
+        await email_service.rate_limiter.acquire()
+        try:
+            success = await email_service.send_email_async(
+                to_email=job["email"],
+                subject=job["subject"],
+                html_content=job["html_content"]
+            )
+            error = None if success else "Send failed"
+        except Exception as e:
+            success = False
+            error = str(e)
+
+        if success:
+            await self.mark_sent(job)
+        else:
+            await self.mark_failed(job, error)
+
+    async def _work(self, worker_id: str, stop: asyncio.Event) -> None:
+        while not stop.is_set():
+            job = await self.claim(worker_id)
+            if job is None:
+                await self.fail_expired()
+                try:
+                    await asyncio.wait_for(stop.wait(), timeout=settings.email_outbox_poll_interval_seconds)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            await self._send(job)
+
+    async def run_worker(self, concurrency: Optional[int] = None, stop: Optional[asyncio.Event] = None) -> None:
+        """Claim and send queued messages until ``stop`` is set"""
+        concurrency = concurrency or settings.email_worker_concurrency
+        stop = stop or asyncio.Event()
+        worker_id = f"{socket.gethostname()}:{os.getpid()}"
+        print(f"Email worker {worker_id} started with {concurrency} senders")
+        await asyncio.gather(*[self._work(worker_id, stop) for _ in range(concurrency)])
+
+
+# Singleton instance
+email_outbox = EmailOutbox()
+
+index_registry.index(EmailOutbox.collection_name, [("status", 1), ("next_attempt_at", 1)])
+index_registry.index(EmailOutbox.collection_name, [("status", 1), ("locked_until", 1)])
+index_registry.index(EmailOutbox.collection_name, [("batch_id", 1), ("status", 1)])
+index_registry.query("due outbox emails", EmailOutbox.collection_name, {
+    "status": PENDING,
+    "next_attempt_at": {"$lte": datetime.utcnow()}
+})
+index_registry.query("outbox batch", EmailOutbox.collection_name, {"batch_id": str(ObjectId())})
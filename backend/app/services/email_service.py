@@ -1,13 +1,101 @@
 import smtplib
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
-from typing import List, Dict, Optional
+from typing import Callable, List, Dict, Optional
 from datetime import datetime
 import asyncio
 from jinja2 import Template
 
 from ..core.config import settings
 
+class SMTPConnectionPool:
+    """
+    Keeps up to ``max_connections`` authenticated SMTP connections open and
+    hands them out to senders, so each message costs one ``send_message``
+    instead of a connect, TLS handshake and login. Connections idle for longer
+    than ``max_idle_seconds`` are closed instead of reused, an idle connection
+    is checked with ``NOOP`` before it is handed out (so a session the server
+    dropped is replaced before any part of a message is sent), and a
+    connection that fails while in use is discarded. Safe to use from several
+    threads.
+    """
+    
+    def __init__(self, connect: Callable[[], smtplib.SMTP], max_connections: int, max_idle_seconds: float):
+        self.connect = connect
+        self.max_idle_seconds = max_idle_seconds
+        self._idle = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(max_connections)
+    
+    def _close(self, server: smtplib.SMTP) -> None:
+        try:
+            server.quit()
+        except Exception:
+            server.close()
+    
+    def _alive(self, server: smtplib.SMTP) -> bool:
+        try:
+            return server.noop()[0] == 250
+        except (smtplib.SMTPException, OSError):
+            return False
+    
+    def _checkout(self) -> smtplib.SMTP:
+        while True:
+            try:
+                server, last_used = self._idle.get_nowait()
+            except queue.Empty:
+                return self.connect()
+            if time.monotonic() - last_used <= self.max_idle_seconds and self._alive(server):
+                return server
+            self._close(server)
+    
+    @contextmanager
+    def connection(self):
+        """Borrow a live connection; it returns to the pool unless the caller raised"""
+        with self._slots:
+            server = self._checkout()
+            try:
+                yield server
+            except Exception:
+                self._close(server)
+                raise
+            self._idle.put((server, time.monotonic()))
+    
+    def close(self) -> None:
+        """Close every idle connection"""
+        while True:
+            try:
+                server, _ = self._idle.get_nowait()
+            except queue.Empty:
+                return
+            self._close(server)
+
+
+class TokenBucket:
+    """Async token bucket: ``rate`` tokens per second with bursts of up to ``capacity``"""
+    
+    def __init__(self, rate: float, capacity: int):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = float(capacity)
+        self.updated_at = time.monotonic()
+        self._lock = asyncio.Lock()
+    
+    async def acquire(self) -> None:
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+                self.updated_at = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
 
 class EmailService:
     """Service for sending emails to users"""
@@ -19,16 +107,30 @@ class EmailService:
         self.smtp_password = settings.smtp_password
         self.from_email = settings.from_email
         self.from_name = settings.from_name or "MindGarden AI"
+        self.pool = SMTPConnectionPool(
+            self._create_connection,
+            max_connections=settings.smtp_pool_size,
+            max_idle_seconds=settings.smtp_pool_max_idle_seconds
+        )
+        self.executor = ThreadPoolExecutor(max_workers=settings.smtp_pool_size, thread_name_prefix="smtp")
+        self._rate_limiter = None
+    
+    @property
+    def rate_limiter(self) -> TokenBucket:
+        # Created lazily so the asyncio lock belongs to the running event loop
+        if self._rate_limiter is None:
+            self._rate_limiter = TokenBucket(settings.smtp_send_rate_per_second, settings.smtp_send_burst)
+        return self._rate_limiter
     
     def _create_connection(self):
         """Create SMTP connection"""
         try:
             if self.smtp_port == 465:
                 # SSL connection
-                server = smtplib.SMTP_SSL(self.smtp_server, self.smtp_port)
+                server = smtplib.SMTP_SSL(self.smtp_server, self.smtp_port, timeout=settings.smtp_timeout_seconds)
             else:
                 # TLS connection
-                server = smtplib.SMTP(self.smtp_server, self.smtp_port)
+                server = smtplib.SMTP(self.smtp_server, self.smtp_port, timeout=settings.smtp_timeout_seconds)
                 server.starttls()
             
             server.login(self.smtp_username, self.smtp_password)
@@ -61,25 +163,24 @@ class EmailService:
             part2 = MIMEText(html_content, 'html')
             msg.attach(part2)
             
-            # Send email
-            server = self._create_connection()
-            server.send_message(msg)
-            server.quit()
+            # Not retried here: after a failure mid-send the server may already have the message
+            with self.pool.connection() as server:
+                server.send_message(msg)
             
             return True
         except Exception as e:
             print(f"Failed to send email to {to_email}: {e}")
             return False
     
-    async def send_bulk_emails(
+    def render_bulk_emails(
         self,
         recipients: List[Dict],
         subject: str,
         html_template: str,
         personalize: bool = True
-    ) -> Dict:
+    ) -> List[Dict]:
         """
-        Send emails to multiple recipients
+        Render one message per recipient
         
         Args:
             recipients: List of dicts with 'email' and optional 'name', 'data' fields
@@ -88,61 +189,47 @@ class EmailService:
             personalize: Whether to personalize emails with user data
         
         Returns:
-            Dict with success/failure counts
+            List of dicts with 'email', 'subject' and 'html_content' fields
         """
-        results = {
-            "total": len(recipients),
-            "sent": 0,
-            "failed": 0,
-            "errors": []
-        }
-        
         template = Template(html_template)
         
+        messages = []
         for recipient in recipients:
-            try:
-                to_email = recipient.get("email")
-                if not to_email:
-                    results["failed"] += 1
-                    results["errors"].append({"email": "unknown", "error": "No email provided"})
-                    continue
-                
-                # Personalize content if enabled
-                if personalize:
-                    context = {
-                        "name": recipient.get("name", "there"),
-                        "email": to_email,
-                        **(recipient.get("data", {}))
-                    }
-                    html_content = template.render(**context)
-                else:
-                    html_content = html_template
-                
-                # Send email
-                success = self.send_email(
-                    to_email=to_email,
-                    subject=subject,
-                    html_content=html_content,
-                    text_content=None
-                )
-                
-                if success:
-                    results["sent"] += 1
-                else:
-                    results["failed"] += 1
-                    results["errors"].append({"email": to_email, "error": "Send failed"})
-                
-                # Small delay to avoid rate limiting
-                await asyncio.sleep(0.1)
-                
-            except Exception as e:
-                results["failed"] += 1
-                results["errors"].append({
-                    "email": recipient.get("email", "unknown"),
-                    "error": str(e)
-                })
+            to_email = recipient.get("email")
+            
+            # Personalize content if enabled
+            if personalize and to_email:
+                context = {
+                    "name": recipient.get("name", "there"),
+                    "email": to_email,
+                    **(recipient.get("data", {}))
+                }
+                html_content = template.render(**context)
+            else:
+                html_content = html_template
+            
+            messages.append({"email": to_email, "subject": subject, "html_content": html_content})
         
-        return results
+        return messages
+    
+    async def send_email_async(
+        self,
+        to_email: str,
+        subject: str,
+        html_content: str,
+        text_content: Optional[str] = None
+    ) -> bool:
+        """Send email on the SMTP executor, so the event loop is never blocked"""
+        loop = asyncio.get_running_loop()
+        future = loop.run_in_executor(self.executor, self.send_email, to_email, subject, html_content, text_content)
+        try:
+            return await asyncio.wait_for(asyncio.shield(future), timeout=settings.smtp_send_timeout_seconds)
+        except asyncio.TimeoutError:
+            # The worker thread cannot be stopped and may still deliver the message, so
+            # reporting a failure here would get it sent twice. Each SMTP operation in
+            # the thread is bounded by the socket timeout; wait for its real outcome.
+            print(f"Sending email to {to_email} is taking longer than {settings.smtp_send_timeout_seconds}s")
+            return await future
     
     def create_notification_email(
         self,
@@ -0,0 +1,297 @@
+from typing import Dict, Iterable, List, Optional, Set
+from datetime import datetime, date, timedelta
+from bson import ObjectId
+from pymongo import UpdateOne
+
+from ..core.database import get_collection, index_registry
+
+# Each calendar document covers one year as six 64-bit words (366 bits used)
+WORD_BITS = 64
+WORDS_PER_YEAR = 6
+WORD_MASK = (1 << WORD_BITS) - 1
+
+# Calendar documents with this year mark a habit whose history has been imported
+BUILT_MARKER_YEAR = 0
+
+
+def normalize_completion_date(value) -> date:
+    """Normalize a stored completion date (ISO string, datetime or date) to a date"""
+    if isinstance(value, str):
+        return datetime.fromisoformat(value).date()
+    if isinstance(value, datetime):
+        return value.date()
+    return value
+
+
+def to_completion_datetime(value: date) -> datetime:
+    """Canonical storage encoding for a completion date: midnight as a datetime"""
+    return datetime.combine(value, datetime.min.time())
+
+
+def completion_date_filter(value: date) -> Dict:
+    """Query filter matching a completion date in the canonical or legacy ISO string encoding"""
+    return {"$in": [to_completion_datetime(value), value.isoformat()]}
+
+
+def _to_signed(word: int) -> int:
+    """Encode an unsigned 64-bit word as a signed int64 for BSON"""
+    return word - (1 << WORD_BITS) if word >= 1 << (WORD_BITS - 1) else word
+
+
+def _word_position(value: date):
+    """Word index and bit mask of a date within its year document"""
+    day_index = value.timetuple().tm_yday - 1
+    return day_index // WORD_BITS, 1 << (day_index % WORD_BITS)
+
+
+class CompletionCalendar:
+    """
+    In-memory completion bitmap for one habit.
+
+    Bit ``i`` of ``bits`` is set when the habit was completed on the day
+    ``base + i`` (proleptic ordinals), so streaks, window counts and totals are
+    computed with shifts, masks and popcounts instead of scanning dates.
+    """
+
+    def __init__(self, base: int = 0, bits: int = 0):
+        self.base = base
+        self.bits = bits
+
+    @classmethod
+    def from_documents(cls, documents: Iterable[Dict]) -> "CompletionCalendar":
+        """Assemble a calendar from stored per-year documents"""
+        year_masks = {}
+        for document in documents:
+            if document["year"] == BUILT_MARKER_YEAR:
+                continue
+            mask = 0
+            for index in range(WORDS_PER_YEAR):
+                mask |= (document.get(f"w{index}", 0) & WORD_MASK) << (index * WORD_BITS)
+            year_masks[document["year"]] = mask
+
+        if not year_masks:
+            return cls()
+
+        base = date(min(year_masks), 1, 1).toordinal()
+        bits = 0
+        for year, mask in year_masks.items():
+            bits |= mask << (date(year, 1, 1).toordinal() - base)
+        return cls(base, bits)
+
+    @classmethod
+    def union(cls, calendars: Iterable["CompletionCalendar"]) -> "CompletionCalendar":
+        """Days on which any of the calendars has a completion"""
+        calendars = [calendar for calendar in calendars if calendar.bits]
+        if not calendars:
+            return cls()
+        base = min(calendar.base for calendar in calendars)
+        bits = 0
+        for calendar in calendars:
+            bits |= calendar.bits << (calendar.base - base)
+        return cls(base, bits)
+
+    def _offset(self, value: date) -> int:
+        return value.toordinal() - self.base
+
+    def add(self, value: date) -> None:
+        offset = self._offset(value)
+        if self.bits == 0:
+            self.base, offset = value.toordinal(), 0
+        elif offset < 0:
+            self.bits <<= -offset
+            self.base = value.toordinal()
+            offset = 0
+        self.bits |= 1 << offset
+
+    def remove(self, value: date) -> None:
+        offset = self._offset(value)
+        if offset >= 0:
+            self.bits &= ~(1 << offset)
+
+    def __contains__(self, value: date) -> bool:
+        offset = self._offset(value)
+        return offset >= 0 and bool(self.bits >> offset & 1)
+
+    def total(self) -> int:
+        return self.bits.bit_count()
+
+    def count_between(self, start: date, end: date) -> int:
+        """Count completions in an inclusive date window"""
+        start_offset = max(self._offset(start), 0)
+        end_offset = self._offset(end)
+        if end_offset < start_offset:
+            return 0
+        window = (self.bits >> start_offset) & ((1 << (end_offset - start_offset + 1)) - 1)
+        return window.bit_count()
+
+    def dates_between(self, start: date, end: date) -> Set[date]:
+        """Completion dates in an inclusive date window"""
+        start_offset = max(self._offset(start), 0)
+        end_offset = self._offset(end)
+        dates = set()
+        if end_offset < start_offset:
+            return dates
+        window = (self.bits >> start_offset) & ((1 << (end_offset - start_offset + 1)) - 1)
+        while window:
+            low_bit = window & -window
+            dates.add(date.fromordinal(self.base + start_offset + low_bit.bit_length() - 1))
+            window ^= low_bit
+        return dates
+
+    def latest_before(self, value: date) -> Optional[date]:
+        """Most recent completion strictly before a date"""
+        offset = self._offset(value)
+        if offset <= 0:
+            return None
+        earlier = self.bits & ((1 << offset) - 1)
+        if not earlier:
+            return None
+        return date.fromordinal(self.base + earlier.bit_length() - 1)
+
+    def latest(self) -> Optional[date]:
+        if not self.bits:
+            return None
+        return date.fromordinal(self.base + self.bits.bit_length() - 1)
+
+    def run_ending_at(self, value: date) -> int:
+        """Length of the run of consecutive completions ending on a date"""
+        offset = self._offset(value)
+        if offset < 0 or not self.bits >> offset & 1:
+            return 0
+        window_mask = (1 << (offset + 1)) - 1
+        gaps = ~self.bits & window_mask
+        if not gaps:
+            return offset + 1
+        return offset - (gaps.bit_length() - 1)
+
+    def longest_run(self):
+        """Longest run of consecutive completions as (start, end, length)"""
+        if not self.bits:
+            return None, None, 0
+
+        # Each pass shortens every run by one; the last survivor ends the longest run
+        length = 0
+        runs = self.bits
+        survivors = runs
+        while runs:
+            survivors = runs
+            runs &= runs >> 1
+            length += 1
+
+        start_offset = (survivors & -survivors).bit_length() - 1
+        start = date.fromordinal(self.base + start_offset)
+        return start, start + timedelta(days=length - 1), length
+
+    def streaks(self, today: date) -> Dict[str, int]:
+        return {
+            "current_streak": self.run_ending_at(today),
+            "longest_streak": self.longest_run()[2]
+        }
+
+    def to_year_words(self) -> Dict[int, List[int]]:
+        """Split the bitmap into signed int64 words per year for storage"""
+        years = {}
+        bits = self.bits
+        while bits:
+            low_bit = bits & -bits
+            value = date.fromordinal(self.base + low_bit.bit_length() - 1)
+            index, mask = _word_position(value)
+            words = years.setdefault(value.year, [0] * WORDS_PER_YEAR)
+            words[index] |= mask
+            bits ^= low_bit
+        return {year: [_to_signed(word) for word in words] for year, words in years.items()}
+
+
+class HabitCalendarStore:
+    """Persistence for per-habit, per-year completion bitmaps in ``habit_calendars``"""
+
+    collection_name = "habit_calendars"
+
+    async def set_completed(self, user_id: str, habit_id: str, value: date, completed: bool = True) -> None:
+        """Atomically set or clear the bit for one day"""
+        index, mask = _word_position(value)
+        operation = {"or": _to_signed(mask)} if completed else {"and": _to_signed(~mask & WORD_MASK)}
+        await get_collection(self.collection_name).update_one(
+            {"user_id": ObjectId(user_id), "habit_id": ObjectId(habit_id), "year": value.year},
+            {"$bit": {f"w{index}": operation}},
+            upsert=True
+        )
+
+    async def load_many(self, user_id: str, habit_ids: List[ObjectId], years: Optional[List[int]] = None) -> Dict[ObjectId, CompletionCalendar]:
+        """Load calendars for many habits, importing legacy completions where needed"""
+        if not habit_ids:
+            return {}
+
+        query = {"user_id": ObjectId(user_id), "habit_id": {"$in": habit_ids}}
+        if years is not None:
+            query["year"] = {"$in": [BUILT_MARKER_YEAR, *years]}
+
+        documents = await get_collection(self.collection_name).find(query).to_list(length=None)
+
+        by_habit = {habit_id: [] for habit_id in habit_ids}
+        built = set()
+        for document in documents:
+            if document["year"] == BUILT_MARKER_YEAR:
+                built.add(document["habit_id"])
+            by_habit[document["habit_id"]].append(document)
+
+        calendars = {
+            habit_id: CompletionCalendar.from_documents(habit_documents)
+            for habit_id, habit_documents in by_habit.items()
+        }
+
+        missing = [habit_id for habit_id in habit_ids if habit_id not in built]
+        if missing:
+            calendars.update(await self._import_completions(user_id, missing))
+
+        return calendars
+
+    async def load(self, user_id: str, habit_id: str, years: Optional[List[int]] = None) -> CompletionCalendar:
+        habit_object_id = ObjectId(habit_id)
+        calendars = await self.load_many(user_id, [habit_object_id], years)
+        return calendars[habit_object_id]
+
+    async def _import_completions(self, user_id: str, habit_ids: List[ObjectId]) -> Dict[ObjectId, CompletionCalendar]:
+        """Build calendars from per-day completion documents in any legacy encoding"""
+        completions = await get_collection("habit_completions").find(
+            {"user_id": ObjectId(user_id), "habit_id": {"$in": habit_ids}},
+            {"habit_id": 1, "date": 1}
+        ).to_list(length=None)
+
+        calendars = {habit_id: CompletionCalendar() for habit_id in habit_ids}
+        for completion in completions:
+            calendars[completion["habit_id"]].add(normalize_completion_date(completion["date"]))
+
+        # OR the imported bits in so concurrent writes are never lost
+        operations = []
+        for habit_id, calendar in calendars.items():
+            for year, words in calendar.to_year_words().items():
+                operations.append(UpdateOne(
+                    {"user_id": ObjectId(user_id), "habit_id": habit_id, "year": year},
+                    {"$bit": {f"w{index}": {"or": word} for index, word in enumerate(words) if word}},
+                    upsert=True
+                ))
+            operations.append(UpdateOne(
+                {"user_id": ObjectId(user_id), "habit_id": habit_id, "year": BUILT_MARKER_YEAR},
+                {"$set": {"built_at": datetime.utcnow()}},
+                upsert=True
+            ))
+        await get_collection(self.collection_name).bulk_write(operations, ordered=False)
+
+        return calendars
+
+    async def delete(self, user_id: str, habit_id: str) -> None:
+        await get_collection(self.collection_name).delete_many({
+            "user_id": ObjectId(user_id),
+            "habit_id": ObjectId(habit_id)
+        })
+
+
+# Singleton instance
+habit_calendar_store = HabitCalendarStore()
+
+index_registry.index(HabitCalendarStore.collection_name, [("user_id", 1), ("habit_id", 1), ("year", 1)], unique=True)
+index_registry.query("habit calendars", HabitCalendarStore.collection_name, {
+    "user_id": ObjectId(),
+    "habit_id": {"$in": [ObjectId()]}
+})
@@ -0,0 +1,120 @@
+import asyncio
+import random
+from typing import AsyncIterator, Dict, List, Optional
+
+from ..core.config import settings
+from ..core.cache import llm_response_cache
+from .llm_providers import LLMProvider, LLMProviderError, create_provider
+
+
+class LLMClient:
+    """
+    Shared asynchronous LLM client.
+
+    Requests go to one long-lived provider (Groq by default, or the local fake
+    selected with ``LLM_PROVIDER=fake``), so connections are reused. Each call
+    is bounded by a timeout, at most ``settings.llm_max_concurrency`` calls are
+    in flight per process, and transient failures are retried with
+    exponential backoff and jitter.
+    """
+
+    def __init__(self, provider: Optional[LLMProvider] = None):
+        self._provider = provider
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+    def configure_provider(self, provider: LLMProvider) -> None:
+        self._provider = provider
+
+    def _get_provider(self) -> LLMProvider:
+        if self._provider is None:
+            self._provider = create_provider()
+        return self._provider
+
+    def _get_semaphore(self) -> asyncio.Semaphore:
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(settings.llm_max_concurrency)
+        return self._semaphore
+
+    async def complete(
+        self,
+        messages: List[Dict[str, str]],
+        model: str,
+        temperature: float,
+        max_tokens: int,
+        response_format: Optional[Dict] = None
+    ) -> str:
+        """Run a chat completion and return the message content"""
+        provider = self._get_provider()
+
+        for attempt in range(settings.llm_max_retries + 1):
+            try:
+                async with self._get_semaphore():
+                    return await asyncio.wait_for(
+                        provider.complete(messages, model, temperature, max_tokens, response_format),
+                        timeout=settings.llm_timeout_seconds
+                    )
+            except (LLMProviderError, asyncio.TimeoutError) as e:
+                if attempt == settings.llm_max_retries:
+                    raise
+                delay = settings.llm_retry_backoff_seconds * (2 ** attempt) * (1 + random.random())
+                print(f"LLM call failed ({type(e).__name__}), retrying in {delay:.1f}s")
+                await asyncio.sleep(delay)
+
+    async def stream(
+        self,
+        messages: List[Dict[str, str]],
+        model: str,
+        temperature: float,
+        max_tokens: int
+    ) -> AsyncIterator[str]:
+        """
+        Run a streaming chat completion, yielding content deltas as they arrive.
+
+        ``settings.llm_timeout_seconds`` bounds the wait for the first delta
+        and between deltas, so a stalled stream raises ``asyncio.TimeoutError``
+        instead of holding its concurrency slot forever.
+        """
+        provider = self._get_provider()
+        semaphore = self._get_semaphore()
+
+        # The concurrency slot is held until the stream is exhausted, stalls or is closed
+        await semaphore.acquire()
+        deltas = provider.stream(messages, model, temperature, max_tokens).__aiter__()
+        try:
+            while True:
+                try:
+                    text = await asyncio.wait_for(deltas.__anext__(), timeout=settings.llm_timeout_seconds)
+                except StopAsyncIteration:
+                    return
+                yield text
+        finally:
+            try:
+                if hasattr(deltas, "aclose"):
+                    await deltas.aclose()
+            finally:
+                semaphore.release()
+
+    async def complete_cached(self, namespace: str, inputs: Dict, **request) -> str:
+        """
+        Like ``complete``, but reuse the response generated for identical inputs.
+
+        ``inputs`` are the structured values the prompt is built from (pending
+        items, streaks, counts), not the prompt text, so prompts that embed
+        volatile details still share a cache entry.
+        """
+        cache_inputs = {"inputs": inputs, "model": request["model"]}
+        cached = await llm_response_cache.get(namespace, cache_inputs)
+        if cached is not None:
+            return cached
+
+        content = await self.complete(**request)
+        await llm_response_cache.set(namespace, cache_inputs, content)
+        return content
+
+    async def close(self) -> None:
+        if self._provider is not None:
+            await self._provider.close()
+
+
+# Singleton instance
+llm_client = LLMClient()
@@ -0,0 +1,219 @@
+import asyncio
+import json
+import math
+import os
+import random
+from typing import AsyncIterator, Dict, List, Optional
+
+from ..core.config import settings
+
+
+class LLMProviderError(Exception):
+    """Transient provider failure (timeout, connection, rate limit, 5xx); safe to retry"""
+
+
+class LLMProvider:
+    """
+    Backend that turns chat messages into completion text.
+
+    ``LLMClient`` adds concurrency limits, retries and caching on top, so
+    providers only translate a single request and raise ``LLMProviderError``
+    for failures worth retrying.
+    """
+
+    async def complete(
+        self,
+        messages: List[Dict[str, str]],
+        model: str,
+        temperature: float,
+        max_tokens: int,
+        response_format: Optional[Dict] = None
+    ) -> str:
+        raise NotImplementedError
+
+    def stream(
+        self,
+        messages: List[Dict[str, str]],
+        model: str,
+        temperature: float,
+        max_tokens: int
+    ) -> AsyncIterator[str]:
+        raise NotImplementedError
+
+    async def close(self) -> None:
+        pass
+
+
+class GroqProvider(LLMProvider):
+    """Groq chat completions over one shared ``AsyncGroq`` connection pool"""
+
+    def __init__(self):
+        self._client = None
+        self._retryable_errors = ()
+
+    def _get_client(self):
+        if self._client is None:
+            import groq
+
+            api_key = settings.groq_api_key or os.getenv("GROQ_API_KEY")
+            if not api_key:
+                raise ValueError("Groq API key not found")
+            # Retries are handled by LLMClient so they share its concurrency limit
+            self._client = groq.AsyncGroq(api_key=api_key, timeout=settings.llm_timeout_seconds, max_retries=0)
+            self._retryable_errors = (groq.APIConnectionError, groq.RateLimitError, groq.InternalServerError)
+        return self._client
+
+    async def complete(self, messages, model, temperature, max_tokens, response_format=None) -> str:
+        client = self._get_client()
+        options = {"response_format": response_format} if response_format else {}
+        try:
+            completion = await client.chat.completions.create(
+                messages=messages,
+                model=model,
+                temperature=temperature,
+                max_tokens=max_tokens,
+                **options
+            )
+        except self._retryable_errors as e:
+            raise LLMProviderError(f"{type(e).__name__}: {str(e)}") from e
+        return completion.choices[0].message.content
+
+    async def stream(self, messages, model, temperature, max_tokens) -> AsyncIterator[str]:
+        client = self._get_client()
+        try:
+            completion_stream = await client.chat.completions.create(
+                messages=messages,
+                model=model,
+                temperature=temperature,
+                max_tokens=max_tokens,
+                stream=True
+            )
+        except self._retryable_errors as e:
+            raise LLMProviderError(f"{type(e).__name__}: {str(e)}") from e
+        async for chunk in completion_stream:
+            if chunk.choices and chunk.choices[0].delta.content:
+                yield chunk.choices[0].delta.content
+
+    async def close(self) -> None:
+        if self._client is not None:
+            await self._client.close()
+            self._client = None
+
+
+# Canned responses of the fake provider, chosen by a marker found in the last message
+DEFAULT_FAKE_RESPONSES = {
+    '"priorityTask"': {
+        "priorityTask": "Review your tasks",
+        "focusTime": "09:00 - 11:00",
+        "habitSuggestion": "Pair your weakest habit with your morning coffee",
+        "schedule": [
+            {"time": "09:00", "activity": "Work on the priority task", "duration": "60 min", "priority": "high"},
+            {"time": "10:00", "activity": "Short walk and water break", "duration": "15 min", "priority": "medium"},
+            {"time": "10:15", "activity": "Clear two small tasks", "duration": "45 min", "priority": "medium"}
+        ],
+        "insight": "Steady beats intense: protect one focused block and the rest of the day follows."
+    },
+    '"suggestions"': {
+        "suggestions": [
+            "Anchor your habits to an existing routine so they happen at the same time each day.",
+            "Your strongest days show what works; copy that setup to your weakest day.",
+            "Shrink any habit you skipped twice this week until it takes under two minutes."
+        ]
+    },
+    "": "🌱 You're making steady progress. Pick one pending item and finish it now; small wins keep your garden growing!"
+}
+
+
+class FakeLLMProvider(LLMProvider):
+    """
+    Local, network-free stand-in for benchmarks and load tests.
+
+    Responses are canned (JSON documents for JSON prompts, a short message
+    otherwise) and can be overridden from a JSON file mapping prompt markers
+    to responses. Latency follows a configurable distribution and a share of
+    calls fails with ``LLMProviderError`` so retry paths are exercised too.
+    """
+
+    def __init__(
+        self,
+        latency_ms: float = 800,
+        latency_spread_ms: float = 300,
+        distribution: str = "normal",
+        failure_rate: float = 0.0,
+        responses: Optional[Dict] = None,
+        seed: Optional[int] = None
+    ):
+        self.latency_ms = latency_ms
+        self.latency_spread_ms = latency_spread_ms
+        self.distribution = distribution
+        self.failure_rate = failure_rate
+        self.responses = {**DEFAULT_FAKE_RESPONSES, **(responses or {})}
+        self.random = random.Random(seed)
+
+    @classmethod
+    def from_settings(cls) -> "FakeLLMProvider":
+        responses = None
+        if settings.llm_fake_responses_file:
+            with open(settings.llm_fake_responses_file, encoding="utf-8") as f:
+                responses = json.load(f)
+        return cls(
+            latency_ms=settings.llm_fake_latency_ms,
+            latency_spread_ms=settings.llm_fake_latency_spread_ms,
+            distribution=settings.llm_fake_latency_distribution,
+            failure_rate=settings.llm_fake_failure_rate,
+            responses=responses,
+            seed=settings.llm_fake_seed
+        )
+
+    def sample_latency(self) -> float:
+        """Sampled call latency in seconds"""
+        mean, spread = self.latency_ms, self.latency_spread_ms
+        if self.distribution == "fixed":
+            latency = mean
+        elif self.distribution == "uniform":
+            latency = self.random.uniform(mean - spread, mean + spread)
+        elif self.distribution == "lognormal":
+            # Median at the mean with a long tail; the spread sets the shape
+            latency = self.random.lognormvariate(math.log(max(mean, 1)), spread / max(mean, 1))
+        else:
+            latency = self.random.gauss(mean, spread)
+        return max(latency, 0) / 1000
+
+    def _response_for(self, messages: List[Dict[str, str]]) -> str:
+        prompt = messages[-1]["content"] if messages else ""
+        # Longest marker first so specific responses win over the default
+        for marker in sorted(self.responses, key=len, reverse=True):
+            if marker in prompt:
+                response = self.responses[marker]
+                return response if isinstance(response, str) else json.dumps(response)
+        return ""
+
+    def _maybe_fail(self) -> None:
+        if self.random.random() < self.failure_rate:
+            raise LLMProviderError("Simulated provider failure")
+
+    async def complete(self, messages, model, temperature, max_tokens, response_format=None) -> str:
+        await asyncio.sleep(self.sample_latency())
+        self._maybe_fail()
+        return self._response_for(messages)
+
+    async def stream(self, messages, model, temperature, max_tokens) -> AsyncIterator[str]:
+        latency = self.sample_latency()
+        content = self._response_for(messages)
+        chunks = [content[index:index + 16] for index in range(0, len(content), 16)]
+
+        # A third of the latency goes to the first token, the rest is spread over the chunks
+        await asyncio.sleep(latency / 3)
+        self._maybe_fail()
+        for chunk in chunks:
+            await asyncio.sleep(latency * 2 / 3 / len(chunks))
+            yield chunk
+
+
+def create_provider() -> LLMProvider:
+    """Provider selected by ``settings.llm_provider``"""
+    if settings.llm_provider == "fake":
+        return FakeLLMProvider.from_settings()
+    if settings.llm_provider == "groq":
+        return GroqProvider()
+    raise ValueError(f"Unknown LLM provider: {settings.llm_provider}")
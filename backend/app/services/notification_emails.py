@@ -0,0 +1,190 @@
+import asyncio
+from typing import Dict, List, Optional
+from datetime import datetime, date, timedelta
+from bson import ObjectId
+
+from ..core.database import get_collection, gather_queries
+from .email_outbox import email_outbox
+from .email_service import email_service
+from .habit_calendar import completion_date_filter
+from .llm_client import llm_client
+
+
+# (upper bound, label) of the item count buckets used to share AI messages between users
+COUNT_BUCKETS = [(0, "0"), (1, "1"), (2, "2"), (3, "3"), (5, "4-5"), (9, "6-9")]
+
+
+def count_bucket(count: int) -> str:
+    """Coarse bucket for an item count, so similar users share one generated message"""
+    for upper, label in COUNT_BUCKETS:
+        if count <= upper:
+            return label
+    return "10+"
+
+
+async def generate_bucket_message(notification_type: str, pending_bucket: str, overdue_bucket: str) -> Optional[str]:
+    """Generate the AI message for one bucket of users; None falls back to the default message"""
+    if notification_type == "habits":
+        prompt = f"""Generate a brief, encouraging message (1-2 sentences) for a user with {pending_bucket} pending habits today. Make it warm and motivating. Do not quote an exact number."""
+    else:
+        prompt = f"""Generate a brief, supportive message (1-2 sentences) for a user with {pending_bucket} pending tasks ({overdue_bucket} overdue). Keep it positive and helpful. Do not quote exact numbers."""
+
+    try:
+        ai_message = await llm_client.complete_cached(
+            "bulk-notification",
+            {"type": notification_type, "pending": pending_bucket, "overdue": overdue_bucket},
+            model="llama-3.1-70b-versatile",
+            messages=[{"role": "user", "content": prompt}],
+            temperature=0.8,
+            max_tokens=100
+        )
+        return ai_message.strip()
+    except Exception as e:
+        print(f"Failed to generate notification message: {e}")
+        return None  # Use default message if AI fails
+
+
+async def pending_habits(user_ids: List[ObjectId], today: date) -> Dict[ObjectId, List[Dict]]:
+    """Active habits scheduled today and not yet completed, per user"""
+    habits, completions = await gather_queries(
+        lambda: get_collection("habits").find(
+            {"user_id": {"$in": user_ids}, "is_active": True},
+            {"user_id": 1, "name": 1, "frequency": 1, "current_streak": 1, "category": 1}
+        ).to_list(length=None),
+        lambda: get_collection("habit_completions").find(
+            {"user_id": {"$in": user_ids}, "date": completion_date_filter(today)},
+            {"habit_id": 1}
+        ).to_list(length=None)
+    )
+
+    completed_habit_ids = {completion["habit_id"] for completion in completions}
+    today_weekday = today.weekday() + 1
+
+    pending = {}
+    for habit in habits:
+        frequency = habit.get("frequency", [])
+        if frequency and today_weekday not in frequency:
+            continue
+        if habit["_id"] in completed_habit_ids:
+            continue
+        pending.setdefault(habit["user_id"], []).append({
+            "name": habit["name"],
+            "streak": habit.get("current_streak", 0),
+            "category": habit.get("category", "General")
+        })
+    return pending
+
+
+async def pending_tasks(user_ids: List[ObjectId], today: date) -> Dict[ObjectId, List[Dict]]:
+    """Incomplete tasks that are undated, overdue or due by tomorrow, per user"""
+    tasks = await get_collection("tasks").find(
+        {"user_id": {"$in": user_ids}, "is_completed": False},
+        {"user_id": 1, "title": 1, "priority": 1, "due_date": 1, "category": 1}
+    ).to_list(length=None)
+
+    tomorrow = today + timedelta(days=1)
+
+    pending = {}
+    for task in tasks:
+        due_date = task.get("due_date")
+        is_overdue = False
+        include_task = True
+
+        if due_date:
+            if isinstance(due_date, str):
+                task_date = datetime.fromisoformat(due_date.replace("Z", "+00:00")).date()
+            else:
+                task_date = due_date.date() if isinstance(due_date, datetime) else due_date
+
+            is_overdue = task_date < today
+            include_task = task_date <= tomorrow
+
+        if include_task:
+            pending.setdefault(task["user_id"], []).append({
+                "title": task["title"],
+                "priority": task.get("priority", "medium"),
+                "due_date": due_date.isoformat() if isinstance(due_date, datetime) else str(due_date) if due_date else "No date",
+                "is_overdue": is_overdue,
+                "category": task.get("category", "General")
+            })
+    return pending
+
+
+class NotificationEmailRun:
+    """
+    One fan-out of habit or task reminder emails.
+
+    Users are fed in batches through ``queue``: their pending items are
+    loaded with one query per collection, the emails rendered and queued in
+    the outbox under a single batch id. AI messages are generated once per
+    count bucket and reused across batches.
+    """
+
+    def __init__(self, notification_type: str, created_by: Optional[str] = None):
+        self.notification_type = notification_type
+        self.created_by = created_by
+        self.subject = f"🌿 {'Daily Habit' if notification_type == 'habits' else 'Task'} Reminder from MindGarden AI"
+        self.batch_id: Optional[str] = None
+        self.email_count = 0
+        self.bucket_messages: Dict = {}
+
+    async def queue(self, users: List[Dict], today: date) -> int:
+        """Queue reminders for users with pending items on ``today``; returns the number queued"""
+        user_ids = [user["_id"] for user in users if user.get("email")]
+        if not user_ids:
+            return 0
+
+        # Get users' pending items
+        if self.notification_type == "habits":
+            pending_items = await pending_habits(user_ids, today)
+        else:  # tasks
+            pending_items = await pending_tasks(user_ids, today)
+
+        recipients = []
+        for user in users:
+            items = pending_items.get(user["_id"])
+            if not items or not user.get("email"):
+                continue  # No pending items for this user
+            overdue_count = sum(1 for item in items if item.get("is_overdue"))
+            recipients.append({
+                "user": user,
+                "items": items,
+                "bucket": (count_bucket(len(items)), count_bucket(overdue_count))
+            })
+
+        # One AI message per input profile, shared by every user in that bucket
+        new_buckets = list({recipient["bucket"] for recipient in recipients} - self.bucket_messages.keys())
+        self.bucket_messages.update(zip(new_buckets, await asyncio.gather(*[
+            generate_bucket_message(self.notification_type, *bucket)
+            for bucket in new_buckets
+        ])))
+
+        emails_to_send = []
+        for recipient in recipients:
+            user = recipient["user"]
+
+            # Create email HTML
+            html_content = email_service.create_notification_email(
+                user_name=user.get("full_name", "User"),
+                notification_type=self.notification_type,
+                items=recipient["items"],
+                ai_message=self.bucket_messages[recipient["bucket"]]
+            )
+
+            emails_to_send.append({
+                "email": user["email"],
+                "name": user.get("full_name", "User"),
+                "html_content": html_content,
+                "subject": self.subject
+            })
+
+        # Queue emails for the outbox worker
+        if emails_to_send:
+            self.batch_id = await email_outbox.enqueue(
+                emails_to_send,
+                kind=self.notification_type,
+                created_by=self.created_by,
+                batch_id=self.batch_id
+            )
+            self.email_count += len(emails_to_send)
+        return len(emails_to_send)
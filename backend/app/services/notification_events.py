@@ -0,0 +1,128 @@
+import asyncio
+from contextlib import asynccontextmanager
+from typing import Dict, Optional, Set, Union
+from datetime import datetime
+from bson import ObjectId
+from pymongo import CursorType
+from pymongo.errors import CollectionInvalid, PyMongoError
+
+from ..core.config import settings
+from ..core.database import database, get_collection
+
+
+class NotificationEventBus:
+    """
+    Per-user notification events shared by every API process.
+
+    Writers ``publish`` an event into the capped ``notification_events``
+    collection. Each process with connected clients runs a single tailable
+    cursor on it and hands matching events to the queues of that user's
+    subscribers, so an idle client costs one open stream and no queries, and
+    an event reaches the user's tabs whichever process serves them. The
+    listener only runs while the process has subscribers. The collection is
+    created by ``ensure_collection`` on application startup.
+    """
+
+    collection_name = "notification_events"
+
+    def __init__(self):
+        self._subscribers: Dict[str, Set[asyncio.Queue]] = {}
+        self._listener: Optional[asyncio.Task] = None
+
+    async def ensure_collection(self) -> None:
+        """
+        Create the capped collection; called on startup, before any ``publish``.
+
+        An insert into a missing collection creates an ordinary one, which a
+        tailable cursor cannot read, so an existing uncapped collection is
+        converted in place. A failed conversion is raised to the caller.
+        """
+        db = database.client[settings.database_name]
+        try:
+            await db.create_collection(
+                self.collection_name,
+                capped=True,
+                size=settings.notification_events_capped_bytes
+            )
+        except CollectionInvalid:
+            options = await get_collection(self.collection_name).options()
+            if options.get("capped"):
+                return  # Already set up
+            print(f"Converting {self.collection_name} to a capped collection")
+            await db.command(
+                "convertToCapped",
+                self.collection_name,
+                size=settings.notification_events_capped_bytes
+            )
+        # A tailable cursor dies immediately on an empty collection
+        await get_collection(self.collection_name).insert_one({
+            "user_id": None,
+            "event": "created",
+            "created_at": datetime.utcnow()
+        })
+
+    async def publish(self, user_id: Union[str, ObjectId], event: str, data: Optional[Dict] = None) -> None:
+        """Best effort: a lost event only delays the client's next refresh"""
+        try:
+            await get_collection(self.collection_name).insert_one({
+                "user_id": str(user_id),
+                "event": event,
+                "data": data or {},
+                "created_at": datetime.utcnow()
+            })
+        except PyMongoError as e:
+            print(f"Failed to publish {event} event: {str(e)}")
+
+    def _dispatch(self, document: Dict) -> None:
+        for queue in self._subscribers.get(document["user_id"], ()):
+            if queue.full():
+                # A slow client only needs the latest state
+                queue.get_nowait()
+            queue.put_nowait({"event": document["event"], "data": document.get("data", {})})
+
+    async def _listen(self) -> None:
+        await self.ensure_collection()
+        collection = get_collection(self.collection_name)
+
+        # Only events published from now on
+        newest = await collection.find_one({}, sort=[("$natural", -1)])
+        last_id = newest["_id"] if newest else ObjectId.from_datetime(datetime.utcnow())
+
+        while self._subscribers:
+            try:
+                # Starting at the last seen event: a tailable cursor without an initial match is dead
+                cursor = collection.find({"_id": {"$gte": last_id}}, cursor_type=CursorType.TAILABLE_AWAIT)
+                while cursor.alive and self._subscribers:
+                    async for document in cursor:
+                        if document["_id"] == last_id:
+                            continue
+                        last_id = document["_id"]
+                        self._dispatch(document)
+            except PyMongoError as e:
+                print(f"Notification event stream interrupted: {str(e)}")
+            # The cursor dies when its starting event was overwritten or after an error
+            await asyncio.sleep(settings.notification_events_retry_seconds)
+
+    @asynccontextmanager
+    async def subscribe(self, user_id: Union[str, ObjectId]):
+        """Queue receiving the user's events for as long as the context is open"""
+        user_id = str(user_id)
+        queue = asyncio.Queue(maxsize=settings.notification_events_queue_size)
+        self._subscribers.setdefault(user_id, set()).add(queue)
+        if self._listener is None or self._listener.done():
+            self._listener = asyncio.create_task(self._listen())
+        try:
+            yield queue
+        finally:
+            self._subscribers[user_id].discard(queue)
+            if not self._subscribers[user_id]:
+                del self._subscribers[user_id]
+
+    async def close(self) -> None:
+        if self._listener is not None:
+            self._listener.cancel()
+            self._listener = None
+
+
+# Singleton instance
+notification_events = NotificationEventBus()
@@ -0,0 +1,89 @@
+from typing import Dict, Iterable, Optional, Union
+from datetime import datetime
+from bson import ObjectId
+
+from ..core.cache import InMemoryCacheBackend
+from ..core.config import settings
+from ..core.database import get_collection, index_registry
+
+DEFAULT_PREFERENCES = {
+    "habits_enabled": True,
+    "tasks_enabled": True,
+    "habits_time": "09:00",
+    "tasks_time": "18:00",
+    "snooze_duration": 30
+}
+
+
+class NotificationPreferenceStore:
+    """
+    Notification preferences per user, read in bulk and cached in process.
+
+    ``get_many`` resolves any number of users with one ``$in`` query for the
+    entries missing from the cache, so fan-out jobs do not issue a lookup per
+    user. ``save`` writes through to the cache; the TTL bounds staleness for
+    writes made by other processes.
+    """
+
+    collection_name = "notification_preferences"
+
+    def __init__(self, backend: InMemoryCacheBackend, ttl: float):
+        self.backend = backend
+        self.ttl = ttl
+
+    def _cache(self, user_id: str, preferences: Optional[Dict]) -> None:
+        # Wrapped so users without saved preferences are cached too
+        if self.ttl > 0:
+            self.backend.set_sync(f"preferences:{user_id}", {"preferences": preferences}, self.ttl)
+
+    async def get_many(self, user_ids: Iterable[Union[str, ObjectId]]) -> Dict[str, Optional[Dict]]:
+        """Saved preferences per user id, None for users who never saved any"""
+        results = {}
+        missing = []
+        for user_id in {str(user_id) for user_id in user_ids}:
+            cached = self.backend.get_sync(f"preferences:{user_id}")
+            if cached is None:
+                missing.append(user_id)
+            else:
+                results[user_id] = cached["preferences"]
+
+        if missing:
+            documents = await get_collection(self.collection_name).find(
+                {"user_id": {"$in": [ObjectId(user_id) for user_id in missing]}},
+                {"_id": 0, "user_id": 1, **{field: 1 for field in DEFAULT_PREFERENCES}}
+            ).to_list(length=None)
+            found = {str(document.pop("user_id")): document for document in documents}
+            for user_id in missing:
+                preferences = found.get(user_id)
+                self._cache(user_id, preferences)
+                results[user_id] = preferences
+
+        return results
+
+    async def get(self, user_id: Union[str, ObjectId]) -> Optional[Dict]:
+        return (await self.get_many([user_id]))[str(user_id)]
+
+    def with_defaults(self, preferences: Optional[Dict]) -> Dict:
+        """Saved preferences completed with the defaults"""
+        return {field: (preferences or {}).get(field, default) for field, default in DEFAULT_PREFERENCES.items()}
+
+    async def save(self, user_id: Union[str, ObjectId], preferences: Dict) -> None:
+        user_object_id = ObjectId(user_id)
+        await get_collection(self.collection_name).update_one(
+            {"user_id": user_object_id},
+            {"$set": {"user_id": user_object_id, **preferences, "updated_at": datetime.utcnow()}},
+            upsert=True
+        )
+        self._cache(str(user_id), {field: preferences[field] for field in DEFAULT_PREFERENCES if field in preferences})
+
+
+# Singleton instance
+notification_preference_store = NotificationPreferenceStore(
+    InMemoryCacheBackend(max_entries=settings.preference_cache_max_entries),
+    ttl=settings.preference_cache_ttl_seconds
+)
+
+index_registry.index(NotificationPreferenceStore.collection_name, [("user_id", 1)], unique=True)
+index_registry.query("notification preferences", NotificationPreferenceStore.collection_name, {
+    "user_id": {"$in": [ObjectId(), ObjectId()]}
+})
@@ -0,0 +1,192 @@
+import asyncio
+from typing import Dict, List, Optional, Union
+from datetime import datetime, time, timedelta, timezone
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+from bson import ObjectId
+from pymongo import DeleteOne, UpdateOne
+
+from ..core.config import settings
+from ..core.database import get_collection, gather_queries, cursor_batches, index_registry
+from .notification_emails import NotificationEmailRun
+from .notification_preferences import notification_preference_store
+
+# Reminder kind -> preference fields holding its switch and local time
+REMINDER_KINDS = {
+    "habits": ("habits_enabled", "habits_time"),
+    "tasks": ("tasks_enabled", "tasks_time")
+}
+
+
+def _zone(name: Optional[str]) -> ZoneInfo:
+    try:
+        return ZoneInfo(name or "UTC")
+    except (ZoneInfoNotFoundError, ValueError):
+        return ZoneInfo("UTC")
+
+
+def _floor_minute(value: datetime) -> datetime:
+    return value.replace(second=0, microsecond=0)
+
+
+def next_due_at(local_time: str, timezone_name: Optional[str], after: datetime) -> datetime:
+    """First UTC minute after ``after`` (naive UTC) at which the clock in a timezone reads ``local_time``"""
+    zone = _zone(timezone_name)
+    hour, minute = (int(part) for part in local_time.split(":"))
+    local_now = after.replace(tzinfo=timezone.utc).astimezone(zone)
+
+    due_date = local_now.date()
+    while True:
+        due = datetime.combine(due_date, time(hour, minute), tzinfo=zone)
+        due_utc = due.astimezone(timezone.utc).replace(tzinfo=None)
+        if due_utc > after:
+            return _floor_minute(due_utc)
+        due_date += timedelta(days=1)
+
+
+class NotificationScheduler:
+    """
+    Sends habit and task reminders at each user's ``habits_time`` and
+    ``tasks_time``, in their timezone.
+
+    ``notification_schedule`` holds one document per user and enabled
+    reminder kind, indexed by the UTC minute it is next due. The scheduler
+    wakes once a minute and only reads that minute's bucket; claiming a
+    reminder advances it to the next day with a conditional update, so
+    several scheduler processes never send the same reminder twice. Users
+    are scheduled once they save notification preferences.
+    """
+
+    collection_name = "notification_schedule"
+
+    def _operations(self, user_id: ObjectId, timezone_name: Optional[str], preferences: Dict, now: datetime) -> List:
+        preferences = notification_preference_store.with_defaults(preferences)
+        operations = []
+        for kind, (enabled_field, time_field) in REMINDER_KINDS.items():
+            key = {"user_id": user_id, "kind": kind}
+            try:
+                due = next_due_at(preferences[time_field], timezone_name, now) if preferences[enabled_field] else None
+            except ValueError:
+                print(f"Invalid {time_field} for user {user_id}: {preferences[time_field]}")
+                due = None
+            if due is None:
+                operations.append(DeleteOne(key))
+                continue
+            operations.append(UpdateOne(key, {"$set": {
+                "local_time": preferences[time_field],
+                "timezone": timezone_name or "UTC",
+                "next_due_at": due
+            }}, upsert=True))
+        return operations
+
+    async def schedule_user(self, user_id: Union[str, ObjectId], timezone_name: Optional[str], preferences: Dict) -> None:
+        """Reschedule a user's reminders after their preferences or timezone changed"""
+        operations = self._operations(ObjectId(user_id), timezone_name, preferences, datetime.utcnow())
+        await get_collection(self.collection_name).bulk_write(operations, ordered=False)
+
+    async def sync(self) -> int:
+        """Schedule every user with saved preferences who has no schedule yet; returns the users checked"""
+        preferences_cursor = get_collection("notification_preferences").find({}).batch_size(settings.notification_batch_size)
+        schedule = get_collection(self.collection_name)
+
+        users_count = 0
+        async for preferences in cursor_batches(preferences_cursor, settings.notification_batch_size):
+            user_ids = [document["user_id"] for document in preferences]
+            users, scheduled = await gather_queries(
+                lambda: get_collection("users").find({"_id": {"$in": user_ids}}, {"timezone": 1}).to_list(length=None),
+                lambda: schedule.distinct("user_id", {"user_id": {"$in": user_ids}})
+            )
+            timezones = {user["_id"]: user.get("timezone") for user in users}
+            scheduled = set(scheduled)
+
+            now = datetime.utcnow()
+            operations = []
+            for document in preferences:
+                if document["user_id"] in timezones and document["user_id"] not in scheduled:
+                    operations.extend(self._operations(document["user_id"], timezones[document["user_id"]], document, now))
+            if operations:
+                await schedule.bulk_write(operations, ordered=False)
+            users_count += len(preferences)
+        return users_count
+
+    async def _claim(self, entry: Dict, now: datetime) -> bool:
+        """Advance a due reminder to its next occurrence; False if another scheduler got it first"""
+        result = await get_collection(self.collection_name).update_one(
+            {"_id": entry["_id"], "next_due_at": entry["next_due_at"]},
+            {"$set": {
+                "next_due_at": next_due_at(entry["local_time"], entry["timezone"], now),
+                "last_due_at": entry["next_due_at"]
+            }}
+        )
+        return result.modified_count == 1
+
+    async def process_minute(self, now: Optional[datetime] = None) -> int:
+        """Send every reminder due up to the current minute; returns the number of emails queued"""
+        now = _floor_minute(now or datetime.utcnow())
+        grace = timedelta(minutes=settings.notification_schedule_grace_minutes)
+        schedule_cursor = get_collection(self.collection_name).find(
+            {"next_due_at": {"$lte": now}}
+        ).batch_size(settings.notification_batch_size)
+
+        runs = {kind: NotificationEmailRun(kind) for kind in REMINDER_KINDS}
+        async for entries in cursor_batches(schedule_cursor, settings.notification_batch_size):
+            claimed = await gather_queries(*[lambda entry=entry: self._claim(entry, now) for entry in entries])
+            # Reminders missed by more than the grace period (scheduler down) are skipped, not sent late
+            entries = [
+                entry for entry, won in zip(entries, claimed)
+                if won and now - entry["next_due_at"] <= grace
+            ]
+            if not entries:
+                continue
+
+            user_ids = list({entry["user_id"] for entry in entries})
+            users, preferences = await gather_queries(
+                lambda: get_collection("users").find({"_id": {"$in": user_ids}}, {"email": 1, "full_name": 1}).to_list(length=None),
+                lambda: notification_preference_store.get_many(user_ids)
+            )
+            users = {user["_id"]: user for user in users}
+
+            # Pending items are counted on each user's local date
+            groups: Dict[tuple, List[Dict]] = {}
+            for entry in entries:
+                user = users.get(entry["user_id"])
+                enabled_field = REMINDER_KINDS[entry["kind"]][0]
+                user_preferences = preferences.get(str(entry["user_id"]))
+                if user is None or user_preferences is None or not user_preferences.get(enabled_field, True):
+                    continue
+                local_date = entry["next_due_at"].replace(tzinfo=timezone.utc).astimezone(_zone(entry["timezone"])).date()
+                groups.setdefault((entry["kind"], local_date), []).append(user)
+
+            for (kind, local_date), group_users in groups.items():
+                await runs[kind].queue(group_users, local_date)
+
+        email_count = sum(run.email_count for run in runs.values())
+        if email_count:
+            print(f"Queued {email_count} scheduled reminders for {now.isoformat()}")
+        return email_count
+
+    async def run(self, stop: Optional[asyncio.Event] = None) -> None:
+        """Process each minute's bucket until ``stop`` is set"""
+        stop = stop or asyncio.Event()
+        await self.sync()
+        while not stop.is_set():
+            try:
+                await self.process_minute()
+            except Exception as e:
+                print(f"Scheduled reminders failed: {str(e)}")
+
+            now = datetime.utcnow()
+            next_minute = _floor_minute(now) + timedelta(minutes=1)
+            try:
+                await asyncio.wait_for(stop.wait(), timeout=(next_minute - now).total_seconds())
+            except asyncio.TimeoutError:
+                pass
+
+
+# Singleton instance
+notification_scheduler = NotificationScheduler()
+
+index_registry.index(NotificationScheduler.collection_name, [("user_id", 1), ("kind", 1)], unique=True)
+index_registry.index(NotificationScheduler.collection_name, [("next_due_at", 1)])
+index_registry.query("reminders due this minute", NotificationScheduler.collection_name, {
+    "next_due_at": {"$lte": datetime.utcnow()}
+})
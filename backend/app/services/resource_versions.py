@@ -0,0 +1,73 @@
+import hashlib
+import hmac
+from typing import Optional, Union
+from datetime import date
+from bson import ObjectId
+from fastapi import Request, Response
+
+from ..core.config import settings
+from ..core.database import get_collection
+
+
+class ResourceVersions:
+    """
+    Per-user version counters for read-heavy resources, exposed as ETags.
+
+    Write endpoints ``bump`` the resources they change after writing. Read
+    endpoints call ``not_modified`` before querying: it reads the counters
+    (one lookup by primary key) and answers ``304 Not Modified`` when the
+    client's ``If-None-Match`` still matches, so the resource query and
+    response serialization are skipped. Counters live in MongoDB rather than
+    in process memory so every API worker agrees on them and they survive
+    restarts. ETags also cover the user, the query string and the current
+    day, since responses depend on all three, and are keyed with the
+    deployment's secret so one user's tag never validates another user's
+    cached copy. Responses carry ``Vary: Authorization`` for the same reason.
+    """
+
+    collection_name = "resource_versions"
+
+    async def bump(self, user_id: Union[str, ObjectId], resource: str) -> None:
+        await get_collection(self.collection_name).update_one(
+            {"_id": f"{user_id}:{resource}"},
+            {"$inc": {"version": 1}},
+            upsert=True
+        )
+
+    async def etag(self, request: Request, user_id: Union[str, ObjectId], *resources: str) -> str:
+        keys = [f"{user_id}:{resource}" for resource in resources]
+        documents = await get_collection(self.collection_name).find({"_id": {"$in": keys}}).to_list(length=None)
+        versions = {document["_id"]: document["version"] for document in documents}
+
+        state = [
+            str(user_id),
+            request.url.path,
+            sorted(request.query_params.multi_items()),
+            date.today().isoformat(),
+            [versions.get(key, 0) for key in keys]
+        ]
+        digest = hmac.new(settings.secret_key.encode("utf-8"), repr(state).encode("utf-8"), hashlib.sha256)
+        return f'W/"{digest.hexdigest()[:32]}"'
+
+    async def not_modified(
+        self,
+        request: Request,
+        response: Response,
+        user_id: Union[str, ObjectId],
+        *resources: str
+    ) -> Optional[Response]:
+        """A 304 response if the client's copy is current; otherwise tag ``response`` and return None"""
+        etag = await self.etag(request, user_id, *resources)
+        headers = {"ETag": etag, "Cache-Control": "private, no-cache", "Vary": "Authorization"}
+        if_none_match = request.headers.get("if-none-match", "")
+        client_etags = {tag.strip() for tag in if_none_match.split(",")}
+        # Weak comparison: W/"x" and "x" match
+        if etag in client_etags or etag[2:] in client_etags:
+            return Response(status_code=304, headers=headers)
+
+        response.headers.update(headers)
+        return None
+
+
+# Singleton instance
+resource_versions = ResourceVersions()
@@ -0,0 +1,233 @@
+from typing import Dict, Optional, Set
+from datetime import datetime, date, timedelta
+from bson import ObjectId
+
+from ..core.database import get_collection, index_registry
+from .habit_calendar import habit_calendar_store, normalize_completion_date, to_completion_datetime
+
+
+def _to_datetime(value: Optional[date]) -> Optional[datetime]:
+    """Convert an optional date to its canonical storage encoding"""
+    if value is None:
+        return None
+    return to_completion_datetime(value)
+
+
+class StreakService:
+    """
+    Materialized streak state per habit.
+
+    Each habit has one document in ``habit_streaks`` holding its latest run of
+    consecutive completion days, its longest run, the total completion count
+    and the last completion date. Completions and removals update that state
+    incrementally, touching at most a window of dates bounded by the longest
+    run, so write cost does not depend on how much history a habit has. A full
+    rebuild is only needed when a date inside the longest run is removed.
+    """
+
+    collection_name = "habit_streaks"
+
+    def _empty_state(self) -> Dict:
+        return {
+            "current_start": None,
+            "current_end": None,
+            "longest_start": None,
+            "longest_end": None,
+            "longest_streak": 0,
+            "total_completions": 0,
+            "last_completion": None
+        }
+
+    async def _load_state(self, user_id: str, habit_id: str) -> Optional[Dict]:
+        """Load the stored streak state with its dates converted to date objects"""
+        state = await get_collection(self.collection_name).find_one({
+            "user_id": ObjectId(user_id),
+            "habit_id": ObjectId(habit_id)
+        })
+        if not state:
+            return None
+
+        for field in ("current_start", "current_end", "longest_start", "longest_end", "last_completion"):
+            if state.get(field) is not None:
+                state[field] = normalize_completion_date(state[field])
+        return state
+
+    async def _save_state(self, user_id: str, habit_id: str, state: Dict) -> None:
+        """Persist streak state, storing dates as midnight datetimes"""
+        state_doc = {
+            "user_id": ObjectId(user_id),
+            "habit_id": ObjectId(habit_id),
+            "current_start": _to_datetime(state["current_start"]),
+            "current_end": _to_datetime(state["current_end"]),
+            "longest_start": _to_datetime(state["longest_start"]),
+            "longest_end": _to_datetime(state["longest_end"]),
+            "longest_streak": state["longest_streak"],
+            "total_completions": state["total_completions"],
+            "last_completion": _to_datetime(state["last_completion"]),
+            "updated_at": datetime.utcnow()
+        }
+        await get_collection(self.collection_name).replace_one(
+            {"user_id": state_doc["user_id"], "habit_id": state_doc["habit_id"]},
+            state_doc,
+            upsert=True
+        )
+
+    async def _load_dates(self, user_id: str, habit_id: str, start: date, end: date) -> Set[date]:
+        """Load completion dates for a habit within an inclusive date window"""
+        if end < start:
+            return set()
+
+        calendar = await habit_calendar_store.load(user_id, habit_id, years=list(range(start.year, end.year + 1)))
+        return calendar.dates_between(start, end)
+
+    async def _latest_date_before(self, user_id: str, habit_id: str, before: date) -> Optional[date]:
+        """Find the most recent completion date strictly before a given date"""
+        calendar = await habit_calendar_store.load(user_id, habit_id)
+        return calendar.latest_before(before)
+
+    def _to_streaks(self, state: Dict) -> Dict[str, int]:
+        """Convert streak state to the current/longest streak counts shown to users"""
+        current_streak = 0
+        if state["current_end"] == date.today():
+            current_streak = (state["current_end"] - state["current_start"]).days + 1
+
+        return {
+            "current_streak": current_streak,
+            "longest_streak": state["longest_streak"],
+            "total_completions": state["total_completions"]
+        }
+
+    def _update_longest(self, state: Dict, run_start: date, run_end: date) -> None:
+        run_length = (run_end - run_start).days + 1
+        if run_length > state["longest_streak"]:
+            state["longest_start"] = run_start
+            state["longest_end"] = run_end
+            state["longest_streak"] = run_length
+
+    async def rebuild(self, user_id: str, habit_id: str) -> Dict:
+        """Recompute streak state from the completion calendar of a habit"""
+        calendar = await habit_calendar_store.load(user_id, habit_id)
+
+        state = self._empty_state()
+        last_completion = calendar.latest()
+        if last_completion is not None:
+            longest_start, longest_end, longest_streak = calendar.longest_run()
+            state.update({
+                "current_start": last_completion - timedelta(days=calendar.run_ending_at(last_completion) - 1),
+                "current_end": last_completion,
+                "longest_start": longest_start,
+                "longest_end": longest_end,
+                "longest_streak": longest_streak,
+                "total_completions": calendar.total(),
+                "last_completion": last_completion
+            })
+
+        await self._save_state(user_id, habit_id, state)
+        return state
+
+    async def get_streaks(self, user_id: str, habit_id: str) -> Dict[str, int]:
+        """Get current streak, longest streak and total completions for a habit"""
+        state = await self._load_state(user_id, habit_id)
+        if state is None:
+            state = await self.rebuild(user_id, habit_id)
+        return self._to_streaks(state)
+
+    async def record_completion(self, user_id: str, habit_id: str, completion_date: date) -> Dict[str, int]:
+        """Update streak state after a new completion has been stored in the calendar"""
+        state = await self._load_state(user_id, habit_id)
+        if state is None:
+            # First write since streak state was introduced; the rebuild already sees this completion
+            state = await self.rebuild(user_id, habit_id)
+            return self._to_streaks(state)
+
+        if state["current_end"] is None:
+            state["current_start"] = completion_date
+            state["current_end"] = completion_date
+            run_start, run_end = completion_date, completion_date
+        elif completion_date > state["current_end"]:
+            if completion_date == state["current_end"] + timedelta(days=1):
+                state["current_end"] = completion_date
+            else:
+                state["current_start"] = completion_date
+                state["current_end"] = completion_date
+            run_start, run_end = state["current_start"], state["current_end"]
+        elif completion_date >= state["current_start"]:
+            # Already part of the current run
+            return self._to_streaks(state)
+        else:
+            # Past date: neighbouring runs are no longer than the longest run,
+            # unless they reach the current run, whose bounds are known
+            span = timedelta(days=state["longest_streak"])
+            window_end = min(completion_date + span, state["current_start"] - timedelta(days=1))
+            dates = await self._load_dates(user_id, habit_id, completion_date - span, window_end)
+            dates.add(completion_date)
+
+            run_start = completion_date
+            while run_start - timedelta(days=1) in dates:
+                run_start -= timedelta(days=1)
+            run_end = completion_date
+            while run_end + timedelta(days=1) in dates:
+                run_end += timedelta(days=1)
+
+            if run_end + timedelta(days=1) == state["current_start"]:
+                state["current_start"] = run_start
+                run_end = state["current_end"]
+
+        self._update_longest(state, run_start, run_end)
+        state["total_completions"] += 1
+        state["last_completion"] = state["current_end"]
+
+        await self._save_state(user_id, habit_id, state)
+        return self._to_streaks(state)
+
+    async def remove_completion(self, user_id: str, habit_id: str, completion_date: date) -> Dict[str, int]:
+        """Update streak state after a completion has been cleared from the calendar"""
+        state = await self._load_state(user_id, habit_id)
+        if state is None or state["current_end"] is None:
+            state = await self.rebuild(user_id, habit_id)
+            return self._to_streaks(state)
+
+        if state["longest_start"] <= completion_date <= state["longest_end"]:
+            # The longest run is broken and the next longest is unknown
+            state = await self.rebuild(user_id, habit_id)
+            return self._to_streaks(state)
+
+        state["total_completions"] = max(state["total_completions"] - 1, 0)
+
+        if state["current_start"] <= completion_date <= state["current_end"]:
+            if completion_date < state["current_end"]:
+                state["current_start"] = completion_date + timedelta(days=1)
+            elif completion_date > state["current_start"]:
+                state["current_end"] = completion_date - timedelta(days=1)
+            else:
+                # The current run was a single day; fall back to the previous run
+                previous_end = await self._latest_date_before(user_id, habit_id, completion_date)
+                if previous_end is None:
+                    state = self._empty_state()
+                else:
+                    span = timedelta(days=state["longest_streak"])
+                    dates = await self._load_dates(user_id, habit_id, previous_end - span, previous_end)
+                    dates.add(previous_end)
+                    previous_start = previous_end
+                    while previous_start - timedelta(days=1) in dates:
+                        previous_start -= timedelta(days=1)
+                    state["current_start"] = previous_start
+                    state["current_end"] = previous_end
+
+        state["last_completion"] = state["current_end"]
+
+        await self._save_state(user_id, habit_id, state)
+        return self._to_streaks(state)
+
+    async def delete_state(self, user_id: str, habit_id: str) -> None:
+        """Remove the streak state of a deleted habit"""
+        await get_collection(self.collection_name).delete_one({
+            "user_id": ObjectId(user_id),
+            "habit_id": ObjectId(habit_id)
+        })
+
+
+# Singleton instance
+streak_service = StreakService()
+
+index_registry.index(StreakService.collection_name, [("user_id", 1), ("habit_id", 1)], unique=True)
@@ -0,0 +1,47 @@
+from typing import Iterable, Optional, Tuple, Union
+from datetime import date
+from bson import ObjectId
+
+from ..core.cache import analytics_cache
+from .daily_stats import daily_stats_service
+from .notification_events import notification_events
+from .resource_versions import resource_versions
+
+
+async def _refresh_daily_stats(user_id: str, days: Iterable[Optional[date]], window: Optional[Tuple[date, date]]) -> None:
+    days = [day for day in days if day is not None]
+    try:
+        if window is not None:
+            await daily_stats_service.refresh_range(user_id, *window)
+        if days:
+            await daily_stats_service.refresh_days(user_id, days)
+    except Exception as e:
+        # The write is already committed; the rollup is rebuilt on its next read instead
+        print(f"Failed to refresh daily stats for user {user_id}: {str(e)}")
+        try:
+            await daily_stats_service.mark_stale(user_id)
+        except Exception as e:
+            print(f"Failed to mark daily stats stale for user {user_id}: {str(e)}")
+
+
+async def record_write(
+    user_id: Union[str, ObjectId],
+    resource: str,
+    days: Iterable[Optional[date]] = (),
+    event: Optional[str] = None,
+    window: Optional[Tuple[date, date]] = None
+) -> None:
+    """
+    Bring derived state up to date after a write endpoint changed ``resource``.
+
+    Recomputes the daily rollup for ``days`` (None entries are skipped) and
+    the inclusive ``window``, drops the user's cached analytics, bumps the
+    resource's ETag version and, if ``event`` is given, publishes it to the
+    user's notification stream. A failed rollup refresh does not stop the
+    rest: clients must never keep validating copies that predate the write.
+    """
+    await _refresh_daily_stats(str(user_id), days, window)
+    await analytics_cache.invalidate_user(user_id)
+    await resource_versions.bump(user_id, resource)
+    if event is not None:
+        await notification_events.publish(user_id, event, {"source": resource})
@@ -0,0 +1,44 @@
+"""
+Backfill the daily_user_stats rollup from existing habit, task and mood data
+Usage: python backfill_daily_stats.py [user_id ...]
+"""
+
+import asyncio
+import sys
+import os
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bson import ObjectId
+
+from app.core.database import connect_to_mongo, close_mongo_connection, get_collection
+from app.services.daily_stats import daily_stats_service
+
+
+async def backfill_daily_stats(user_ids):
+    await connect_to_mongo()
+
+    try:
+        if user_ids:
+            user_filter = {"_id": {"$in": [ObjectId(user_id) for user_id in user_ids]}}
+        else:
+            user_filter = {}
+
+        users_cursor = get_collection("users").find(user_filter, {"_id": 1})
+
+        users_count = 0
+        days_count = 0
+        async for user in users_cursor:
+            days_written = await daily_stats_service.rebuild(str(user["_id"]))
+            users_count += 1
+            days_count += days_written
+            print(f"  {user['_id']}: {days_written} days")
+
+        print(f"✅ Rebuilt daily stats for {users_count} users ({days_count} days)")
+    finally:
+        await close_mongo_connection()
+
+
+if __name__ == "__main__":
+    asyncio.run(backfill_daily_stats(sys.argv[1:]))
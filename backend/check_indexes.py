@@ -0,0 +1,38 @@
+"""
+Create the registered MongoDB indexes and verify the query plans of canonical queries
+Exits with a non-zero status when any canonical query falls back to a collection scan
+"""
+
+import asyncio
+import sys
+import os
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Importing the app registers the indexes and queries of every router and service
+import app.main  # noqa: F401
+from app.core.database import connect_to_mongo, close_mongo_connection, index_registry
+
+
+async def check_indexes():
+    await connect_to_mongo()
+
+    try:
+        await index_registry.apply()
+        print()
+        collection_scans = await index_registry.verify()
+    finally:
+        await close_mongo_connection()
+
+    if collection_scans:
+        print(f"\n❌ {len(collection_scans)} queries scan a whole collection")
+        return False
+
+    print(f"\n✅ All {len(index_registry.queries)} canonical queries use an index")
+    return True
+
+
+if __name__ == "__main__":
+    success = asyncio.run(check_indexes())
+    sys.exit(0 if success else 1)
@@ -0,0 +1,36 @@
+"""
+Email outbox worker: sends the emails queued by the API from the email_outbox collection
+Run one or more of these next to the API: python email_worker.py [concurrency]
+"""
+
+import asyncio
+import sys
+import os
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.database import connect_to_mongo, close_mongo_connection, index_registry
+from app.services.email_outbox import email_outbox
+from app.services.email_service import email_service
+
+
+async def run_email_worker(concurrency):
+    await connect_to_mongo()
+
+    try:
+        await index_registry.apply()
+        await email_outbox.run_worker(concurrency)
+    finally:
+        email_service.executor.shutdown(wait=False)
+        email_service.pool.close()
+        await close_mongo_connection()
+
+
+if __name__ == "__main__":
+    concurrency = int(sys.argv[1]) if len(sys.argv) > 1 else None
+    try:
+        asyncio.run(run_email_worker(concurrency))
+    except KeyboardInterrupt:
+        # Messages claimed at shutdown are picked up again once their lease expires
+        print("Email worker stopped")
@@ -0,0 +1,32 @@
+"""
+Reminder scheduler: sends habit and task reminder emails at each user's preferred local time
+Run it next to the email worker, which delivers the queued reminders: python notification_scheduler.py
+"""
+
+import asyncio
+import sys
+import os
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.database import connect_to_mongo, close_mongo_connection, index_registry
+from app.services.notification_scheduler import notification_scheduler
+
+
+async def run_notification_scheduler():
+    await connect_to_mongo()
+
+    try:
+        await index_registry.apply()
+        print("Notification scheduler started")
+        await notification_scheduler.run()
+    finally:
+        await close_mongo_connection()
+
+
+if __name__ == "__main__":
+    try:
+        asyncio.run(run_notification_scheduler())
+    except KeyboardInterrupt:
+        print("Notification scheduler stopped")
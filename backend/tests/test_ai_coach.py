@@ -0,0 +1,57 @@
+import json
+import random
+
+from app.api.ai_coach import ScheduleItemParser
+
+PLAN = {
+    "greeting": "Morning! {Braces} and [brackets] in strings are not structure",
+    "notes": [{"time": "07:00", "activity": "not part of the schedule"}],
+    "schedule": [
+        {"time": "08:00", "activity": "Meditate", "type": "habit"},
+        {"time": "09:30", "activity": "Write the \"quarterly\" report \\ draft", "type": "task"},
+        {"time": "12:00", "activity": "Lunch {break}", "details": {"tags": ["rest", "food"], "schedule": []}},
+        {"time": "18:00", "activity": "Run ]}", "type": "habit"}
+    ],
+    "summary": {"schedule": [{"time": "20:00", "activity": "nested schedule key"}]}
+}
+
+
+def _feed(parser, text, chunk_sizes):
+    items = []
+    position = 0
+    for size in chunk_sizes:
+        items.extend(parser.feed(text[position:position + size]))
+        position += size
+    items.extend(parser.feed(text[position:]))
+    return items
+
+
+def test_items_are_emitted_in_order_for_any_chunking():
+    text = json.dumps(PLAN, indent=2)
+    rng = random.Random(1)
+    for _ in range(200):
+        parser = ScheduleItemParser()
+        chunk_sizes = [rng.randint(1, 12) for _ in range(len(text))]
+        assert _feed(parser, text, chunk_sizes) == PLAN["schedule"]
+        assert parser.buffer == text
+
+
+def test_one_character_at_a_time():
+    text = json.dumps(PLAN)
+    parser = ScheduleItemParser()
+    assert _feed(parser, text, [1] * len(text)) == PLAN["schedule"]
+
+
+def test_each_item_is_emitted_as_soon_as_it_closes():
+    parser = ScheduleItemParser()
+    assert parser.feed('Here is your plan:\n{"schedule": [{"time": "08:00", "activity": "Read"}') == [
+        {"time": "08:00", "activity": "Read"}
+    ]
+    assert parser.feed(', {"time": "09:00", "activ') == []
+    assert parser.feed('ity": "Walk"}]}') == [{"time": "09:00", "activity": "Walk"}]
+
+
+def test_malformed_items_are_skipped():
+    parser = ScheduleItemParser()
+    items = parser.feed('{"schedule": [{"time": 08:00}, {"time": "09:00"}]}')
+    assert items == [{"time": "09:00"}]
@@ -0,0 +1,50 @@
+import asyncio
+
+from app.core.database import gather_queries
+
+
+def test_gather_queries_limits_operations_in_flight():
+    in_flight = 0
+    peak = 0
+    started = []
+
+    async def operation(index):
+        nonlocal in_flight, peak
+        started.append(index)
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        return index
+
+    results = asyncio.run(gather_queries(*[lambda index=index: operation(index) for index in range(10)], limit=3))
+
+    assert results == list(range(10))
+    assert sorted(started) == list(range(10))
+    assert peak == 3
+
+
+def test_gather_queries_starts_operations_only_once_they_hold_a_slot():
+    calls = []
+
+    async def run():
+        release = asyncio.Event()
+
+        async def operation(index):
+            await release.wait()
+            return index
+
+        def factory(index):
+            calls.append(index)
+            return operation(index)
+
+        task = asyncio.create_task(gather_queries(*[lambda index=index: factory(index) for index in range(5)], limit=2))
+        await asyncio.sleep(0.01)
+        called_while_blocked = list(calls)
+        release.set()
+        return called_while_blocked, await task
+
+    called_while_blocked, results = asyncio.run(run())
+
+    assert called_while_blocked == [0, 1]
+    assert results == list(range(5))
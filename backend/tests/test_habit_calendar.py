@@ -0,0 +1,144 @@
+import random
+from datetime import date, timedelta
+
+from app.services.habit_calendar import BUILT_MARKER_YEAR, CompletionCalendar
+
+EVERYTHING = (date(2000, 1, 1), date(2099, 12, 31))
+
+
+def _runs(dates):
+    """Runs of consecutive dates as (start, end) pairs, oldest first"""
+    runs = []
+    for value in sorted(dates):
+        if runs and runs[-1][1] + timedelta(days=1) == value:
+            runs[-1] = (runs[-1][0], value)
+        else:
+            runs.append((value, value))
+    return runs
+
+
+def _length(run):
+    return (run[1] - run[0]).days + 1
+
+
+def _random_dates(rng, start, days, count):
+    return {start + timedelta(days=rng.randrange(days)) for _ in range(count)}
+
+
+def _documents(calendar):
+    """Stored per-year documents for a calendar, as the store writes them"""
+    documents = [{"year": BUILT_MARKER_YEAR}]
+    for year, words in calendar.to_year_words().items():
+        documents.append({"year": year, **{f"w{index}": word for index, word in enumerate(words) if word}})
+    return documents
+
+
+def test_add_remove_and_queries_match_a_set():
+    rng = random.Random(3)
+    start = date(2023, 11, 1)
+    for _ in range(50):
+        calendar = CompletionCalendar()
+        dates = set()
+        for _ in range(60):
+            value = start + timedelta(days=rng.randrange(120))
+            if value in dates and rng.random() < 0.4:
+                dates.discard(value)
+                calendar.remove(value)
+            else:
+                dates.add(value)
+                calendar.add(value)
+
+        assert calendar.total() == len(dates)
+        assert calendar.latest() == (max(dates) if dates else None)
+        for offset in range(-5, 130):
+            value = start + timedelta(days=offset)
+            assert (value in calendar) == (value in dates)
+            earlier = [other for other in dates if other < value]
+            assert calendar.latest_before(value) == (max(earlier) if earlier else None)
+
+        for _ in range(20):
+            window_start = start + timedelta(days=rng.randrange(-10, 130))
+            window_end = window_start + timedelta(days=rng.randrange(-3, 60))
+            expected = {value for value in dates if window_start <= value <= window_end}
+            assert calendar.dates_between(window_start, window_end) == expected
+            assert calendar.count_between(window_start, window_end) == len(expected)
+
+
+def test_runs_match_brute_force():
+    rng = random.Random(7)
+    start = date(2024, 12, 1)
+    for _ in range(200):
+        dates = _random_dates(rng, start, 60, rng.randrange(1, 50))
+        calendar = CompletionCalendar()
+        for value in dates:
+            calendar.add(value)
+
+        runs = _runs(dates)
+        longest = max(_length(run) for run in runs)
+        run_start, run_end, length = calendar.longest_run()
+        assert length == longest
+        assert run_end - run_start == timedelta(days=longest - 1)
+        assert all(run_start + timedelta(days=offset) in dates for offset in range(longest))
+
+        for offset in range(-2, 62):
+            value = start + timedelta(days=offset)
+            expected = next((_length((first, value)) for first, last in runs if first <= value <= last), 0)
+            assert calendar.run_ending_at(value) == expected
+
+
+def test_empty_calendar():
+    calendar = CompletionCalendar()
+    assert calendar.total() == 0
+    assert calendar.latest() is None
+    assert calendar.longest_run() == (None, None, 0)
+    assert calendar.streaks(date(2024, 1, 1)) == {"current_streak": 0, "longest_streak": 0}
+    assert calendar.to_year_words() == {}
+    assert CompletionCalendar.from_documents([{"year": BUILT_MARKER_YEAR}]).total() == 0
+
+
+def test_year_words_round_trip_across_year_boundaries():
+    rng = random.Random(11)
+    # Leap day, the last day of a leap year (bit 365) and the top bit of each word
+    edges = {date(2024, 2, 29), date(2024, 12, 31), date(2023, 12, 31), date(2025, 1, 1)}
+    edges |= {date(2024, 1, 1) + timedelta(days=64 * index + 63) for index in range(5)}
+    for _ in range(50):
+        dates = edges | _random_dates(rng, date(2022, 12, 1), 3 * 365, rng.randrange(100))
+        calendar = CompletionCalendar()
+        for value in dates:
+            calendar.add(value)
+
+        words = calendar.to_year_words()
+        assert set(words) == {value.year for value in dates}
+        assert all(-(1 << 63) <= word < 1 << 63 for year_words in words.values() for word in year_words)
+
+        restored = CompletionCalendar.from_documents(_documents(calendar))
+        assert restored.dates_between(*EVERYTHING) == dates
+        assert restored.longest_run()[2] == calendar.longest_run()[2]
+
+
+def test_from_documents_ignores_the_built_marker_and_missing_words():
+    documents = [
+        {"year": BUILT_MARKER_YEAR, "built_at": None},
+        {"year": 2024, "w5": 1 << 1},
+        {"year": 2023, "w0": 1}
+    ]
+    calendar = CompletionCalendar.from_documents(documents)
+    assert calendar.dates_between(*EVERYTHING) == {date(2023, 1, 1), date(2024, 1, 1) + timedelta(days=64 * 5 + 1)}
+
+
+
+def test_union():
+    rng = random.Random(5)
+    calendars = []
+    dates = set()
+    for _ in range(5):
+        habit_dates = _random_dates(rng, date(2023, 12, 1), 90, 20)
+        calendar = CompletionCalendar()
+        for value in habit_dates:
+            calendar.add(value)
+        calendars.append(calendar)
+        dates |= habit_dates
+
+    union = CompletionCalendar.union([CompletionCalendar(), *calendars])
+    assert union.dates_between(*EVERYTHING) == dates
+    assert CompletionCalendar.union([]).total() == 0
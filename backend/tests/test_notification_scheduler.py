@@ -0,0 +1,56 @@
+import random
+from datetime import datetime, timedelta, timezone
+from zoneinfo import ZoneInfo
+
+from app.services.notification_scheduler import next_due_at
+
+
+def test_next_local_time_in_utc():
+    # 09:00 in New York is 14:00 UTC in winter and 13:00 UTC in summer
+    assert next_due_at("09:00", "America/New_York", datetime(2024, 1, 15, 12, 0)) == datetime(2024, 1, 15, 14, 0)
+    assert next_due_at("09:00", "America/New_York", datetime(2024, 7, 1, 12, 0)) == datetime(2024, 7, 1, 13, 0)
+    assert next_due_at("09:00", "America/New_York", datetime(2024, 1, 15, 13, 59, 30)) == datetime(2024, 1, 15, 14, 0)
+
+
+def test_due_time_is_strictly_after():
+    assert next_due_at("09:00", "America/New_York", datetime(2024, 1, 15, 14, 0)) == datetime(2024, 1, 16, 14, 0)
+    assert next_due_at("09:00", "America/New_York", datetime(2024, 1, 15, 15, 0)) == datetime(2024, 1, 16, 14, 0)
+
+
+def test_offsets_that_cross_the_utc_date():
+    assert next_due_at("09:00", "Asia/Kolkata", datetime(2024, 1, 15, 0, 0)) == datetime(2024, 1, 15, 3, 30)
+    # Already the afternoon of the 15th in Auckland: the next 08:00 is the evening of the 15th in UTC
+    assert next_due_at("08:00", "Pacific/Auckland", datetime(2024, 1, 15, 0, 0)) == datetime(2024, 1, 15, 19, 0)
+    assert next_due_at("23:30", "America/Los_Angeles", datetime(2024, 1, 15, 12, 0)) == datetime(2024, 1, 16, 7, 30)
+
+
+def test_daylight_saving_transitions():
+    # Spring forward: the day after an EST morning is due at the EDT offset
+    assert next_due_at("09:00", "America/New_York", datetime(2024, 3, 9, 15, 0)) == datetime(2024, 3, 10, 13, 0)
+    # 02:30 does not exist on that day and resolves one hour later
+    assert next_due_at("02:30", "America/New_York", datetime(2024, 3, 10, 5, 0)) == datetime(2024, 3, 10, 7, 30)
+    # 01:30 happens twice when falling back; the first one is used
+    assert next_due_at("01:30", "America/New_York", datetime(2024, 11, 3, 4, 0)) == datetime(2024, 11, 3, 5, 30)
+
+
+def test_unknown_or_missing_timezone_falls_back_to_utc():
+    assert next_due_at("09:00", None, datetime(2024, 1, 15, 8, 0)) == datetime(2024, 1, 15, 9, 0)
+    assert next_due_at("09:00", "Mars/Olympus_Mons", datetime(2024, 1, 15, 10, 0)) == datetime(2024, 1, 16, 9, 0)
+
+
+def test_random_times_are_the_next_matching_local_minute():
+    rng = random.Random(2)
+    zones = ["UTC", "America/New_York", "Europe/London", "Asia/Kolkata", "Australia/Adelaide", "Pacific/Auckland"]
+    for _ in range(2000):
+        zone_name = rng.choice(zones)
+        local_time = f"{rng.randrange(24):02d}:{rng.randrange(60):02d}"
+        after = datetime(2024, 1, 1) + timedelta(seconds=rng.randrange(366 * 24 * 3600))
+
+        due = next_due_at(local_time, zone_name, after)
+
+        assert after < due <= after + timedelta(hours=25)
+        assert due.second == 0 and due.microsecond == 0
+        local = due.replace(tzinfo=timezone.utc).astimezone(ZoneInfo(zone_name))
+        if local.strftime("%H:%M") != local_time:
+            # Only a local time skipped by a daylight saving change may move
+            assert local.utcoffset() != (local - timedelta(hours=2)).utcoffset()
@@ -0,0 +1,124 @@
+import asyncio
+import random
+from datetime import date, timedelta
+
+from app.services.streak_service import StreakService
+
+USER_ID = "0" * 24
+HABIT_ID = "1" * 24
+
+
+def _reference_state(dates):
+    """Streak state recomputed from scratch, as a full rebuild would store it"""
+    runs = []
+    for value in sorted(dates):
+        if runs and runs[-1][1] + timedelta(days=1) == value:
+            runs[-1] = (runs[-1][0], value)
+        else:
+            runs.append((value, value))
+    if not runs:
+        return {
+            "current_start": None,
+            "current_end": None,
+            "longest_start": None,
+            "longest_end": None,
+            "longest_streak": 0,
+            "total_completions": 0,
+            "last_completion": None
+        }
+
+    longest = max(runs, key=lambda run: (run[1] - run[0]).days)
+    return {
+        "current_start": runs[-1][0],
+        "current_end": runs[-1][1],
+        "longest_start": longest[0],
+        "longest_end": longest[1],
+        "longest_streak": (longest[1] - longest[0]).days + 1,
+        "total_completions": len(dates),
+        "last_completion": runs[-1][1]
+    }
+
+
+class InMemoryStreakService(StreakService):
+    """Streak engine over an in-memory set of completion dates instead of MongoDB"""
+
+    def __init__(self):
+        self.dates = set()
+        self.state = None
+        self.rebuilds = 0
+
+    async def _load_state(self, user_id, habit_id):
+        return dict(self.state) if self.state is not None else None
+
+    async def _save_state(self, user_id, habit_id, state):
+        self.state = dict(state)
+
+    async def _load_dates(self, user_id, habit_id, start, end):
+        return {value for value in self.dates if start <= value <= end}
+
+    async def _latest_date_before(self, user_id, habit_id, before):
+        earlier = [value for value in self.dates if value < before]
+        return max(earlier) if earlier else None
+
+    async def rebuild(self, user_id, habit_id):
+        self.rebuilds += 1
+        self.state = _reference_state(self.dates)
+        return dict(self.state)
+
+
+def _assert_matches_reference(service):
+    expected = _reference_state(service.dates)
+    for field in ("current_start", "current_end", "longest_streak", "total_completions", "last_completion"):
+        assert service.state[field] == expected[field], field
+    # Any longest run will do, but it must be one
+    if expected["longest_streak"]:
+        assert (service.state["longest_end"] - service.state["longest_start"]).days + 1 == expected["longest_streak"]
+        assert all(
+            service.state["longest_start"] + timedelta(days=offset) in service.dates
+            for offset in range(expected["longest_streak"])
+        )
+
+
+async def _replay(seed, days, steps):
+    rng = random.Random(seed)
+    service = InMemoryStreakService()
+    start = date(2024, 12, 1)
+    for _ in range(steps):
+        value = start + timedelta(days=rng.randrange(days))
+        # Endpoints write the calendar first and reject duplicate completions
+        if value in service.dates:
+            service.dates.discard(value)
+            await service.remove_completion(USER_ID, HABIT_ID, value)
+        else:
+            service.dates.add(value)
+            await service.record_completion(USER_ID, HABIT_ID, value)
+        _assert_matches_reference(service)
+    return service
+
+
+def test_random_completion_sequences_match_a_full_rebuild():
+    for seed in range(100):
+        asyncio.run(_replay(seed, days=40, steps=150))
+
+
+def test_sparse_histories_match_a_full_rebuild():
+    for seed in range(100):
+        asyncio.run(_replay(seed, days=400, steps=80))
+
+
+def test_appending_days_does_not_rebuild():
+    async def run():
+        service = InMemoryStreakService()
+        start = date(2024, 1, 1)
+        for offset in (0, 1, 2, 5, 6, 3, 4):
+            value = start + timedelta(days=offset)
+            service.dates.add(value)
+            await service.record_completion(USER_ID, HABIT_ID, value)
+            _assert_matches_reference(service)
+        return service
+
+    service = asyncio.run(run())
+    # Only the first write, which finds no stored state, rebuilds
+    assert service.rebuilds == 1
+    assert service.state["current_start"] == date(2024, 1, 1)
+    assert service.state["longest_streak"] == 7
@@ -27,20 +27,23 @@ function AppHeader({ title, subtitle, user, onLogout }) {
   const [pendingCount, setPendingCount] = useState(0);
 
   useEffect(() => {
-    loadPendingCount();
     // Initialize notification service and schedule notifications
     initializeNotifications();
 
-    // Refresh pending count every 5 minutes
-    const interval = setInterval(loadPendingCount, 5 * 60 * 1000);
-    return () => clearInterval(interval);
+    // The pending count is pushed on connect and whenever habits or tasks change
+    const unsubscribe = notificationService.subscribe((event, data) => {
+      if (event === "pending") {
+        setPendingCount(data.total_count || 0);
+      } else if (event === "preferences") {
+        notificationService.scheduleNotifications(data);
+      }
+    });
+    return () => {
+      unsubscribe();
+      notificationService.clearScheduledNotifications();
+    };
   }, []);
 
-  const loadPendingCount = async () => {
-    const data = await notificationService.getPendingCount();
-    setPendingCount(data.total_count || 0);
-  };
-
   const initializeNotifications = async () => {
     const preferences = await notificationService.getPreferences();
     if (preferences) {
@@ -161,10 +164,7 @@ function AppHeader({ title, subtitle, user, onLogout }) {
       {/* Notification Settings Dialog */}
       <NotificationSettings
         open={notificationSettingsOpen}
-        onClose={() => {
-          setNotificationSettingsOpen(false);
-          loadPendingCount(); // Refresh count when closing
-        }}
+        onClose={() => setNotificationSettingsOpen(false)}
       />
     </>
   );
@@ -197,6 +197,69 @@ class NotificationService {
     }
   }
 
+  // Subscribe to pushed notification events (pending, preferences)
+  // Reconnects with backoff until the returned function is called
+  subscribe(onEvent) {
+    let controller = null;
+    let retryTimeout = null;
+    let retryDelay = 1000;
+    let stopped = false;
+
+    const connect = async () => {
+      controller = new AbortController();
+      try {
+        const token = localStorage.getItem("access_token");
+        const response = await fetch(`${api.defaults.baseURL}/notifications/stream`, {
+          headers: token ? { Authorization: `Bearer ${token}` } : {},
+          signal: controller.signal,
+        });
+        if (!response.ok) {
+          throw new Error(`Notification stream failed: ${response.status}`);
+        }
+
+        const reader = response.body.getReader();
+        const decoder = new TextDecoder();
+        let buffer = "";
+        retryDelay = 1000;
+
+        while (true) {
+          const { done, value } = await reader.read();
+          if (done) break;
+          buffer += decoder.decode(value, { stream: true });
+
+          // Events are separated by a blank line; comment lines are keepalives
+          const events = buffer.split("\n\n");
+          buffer = events.pop();
+          for (const rawEvent of events) {
+            let event = "message";
+            let data = "";
+            for (const line of rawEvent.split("\n")) {
+              if (line.startsWith("event: ")) event = line.slice(7);
+              else if (line.startsWith("data: ")) data += line.slice(6);
+            }
+            if (data) onEvent(event, JSON.parse(data));
+          }
+        }
+      } catch (error) {
+        if (stopped) return;
+        console.error("Notification stream error:", error);
+      }
+
+      if (!stopped) {
+        retryTimeout = setTimeout(connect, retryDelay);
+        retryDelay = Math.min(retryDelay * 2, 60000);
+      }
+    };
+
+    connect();
+
+    return () => {
+      stopped = true;
+      if (retryTimeout) clearTimeout(retryTimeout);
+      if (controller) controller.abort();
+    };
+  }
+
   // Get pending notifications count
   async getPendingCount() {
     try {
@@ -280,7 +343,7 @@ class NotificationService {
       );
     }
 
-    // Schedule periodic check for missed items (every 3 hours)
+    // Check for missed items now and once a day
     this.scheduleMissedItemsCheck();
   }
 
@@ -313,25 +376,30 @@ class NotificationService {
     }
   }
 
-  // Schedule periodic missed items check (every 3 hours)
+  // Check for missed items now and again at each local midnight, when yesterday's habits can become missed
   scheduleMissedItemsCheck() {
-    // Clear existing interval if any
+    // Clear existing timer if any
     if (this.missedItemsInterval) {
-      clearInterval(this.missedItemsInterval);
+      clearTimeout(this.missedItemsInterval);
     }
 
-    // Check every 3 hours
-    const THREE_HOURS = 3 * 60 * 60 * 1000;
-
     // Run immediately on initialization
     this.checkMissedItems();
 
-    // Then schedule regular checks
-    this.missedItemsInterval = setInterval(() => {
-      this.checkMissedItems();
-    }, THREE_HOURS);
+    const scheduleNextCheck = () => {
+      const now = new Date();
+      const nextMidnight = new Date(now);
+      nextMidnight.setHours(24, 0, 5, 0);
+
+      this.missedItemsInterval = setTimeout(() => {
+        this.checkMissedItems();
+        scheduleNextCheck();
+      }, nextMidnight - now);
+    };
+
+    scheduleNextCheck();
 
-    console.log("Scheduled missed items check every 3 hours");
+    console.log("Scheduled missed items check at midnight");
   }
 
   // Helper to schedule notifications at specific times
@@ -369,7 +437,7 @@ class NotificationService {
       this.tasksInterval = null;
     }
     if (this.missedItemsInterval) {
-      clearInterval(this.missedItemsInterval);
+      clearTimeout(this.missedItemsInterval);
       this.missedItemsInterval = null;
     }
   }